@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+
+from gmgn_scheduler import BACKGROUND, PRIORITIES
+
+class CacheEntry:
+    def __init__(self, fetch):
+        self.fetch = fetch        # fetch(priority) -> 协程，返回 (是否成功, 值)
+        self.value = None
+        self.fetched_at = None
+        self.score = 0.0          # 按半衰期衰减的访问次数
+        self.accessed_at = time.time()
+        self.refreshing = None    # 正在进行的刷新任务
+        self.refresh_priority = None
+        self.waiters = {}         # 刷新任务 -> 等待其结果的请求数
+
+class ResultCache:
+    """
+    抓取结果缓存
+    - ttl 内的数据直接返回
+    - 过期但未超过 max_stale 的数据也立即返回，同时在后台(background优先级)刷新
+    - 记录每个key的访问频率，warm() 在热门数据过期前主动刷新
+    """
+    def __init__(self, ttl=300, max_stale=3600, max_entries=10000, half_life=3600):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.half_life = half_life
+        self.entries = {}
+
+    def _decayed_score(self, entry, now):
+        return entry.score * 0.5 ** ((now - entry.accessed_at) / self.half_life)
+
+    def _touch(self, key, fetch):
+        now = time.time()
+        entry = self.entries.get(key)
+        if entry is None:
+            self._prune()
+            entry = self.entries[key] = CacheEntry(fetch)
+        entry.fetch = fetch
+        entry.score = self._decayed_score(entry, now) + 1
+        entry.accessed_at = now
+        return entry
+
+    def _prune(self):
+        """
+        超过容量时丢弃访问频率最低的一成
+        """
+        if len(self.entries) <= self.max_entries:
+            return
+        now = time.time()
+        coldest = sorted(self.entries, key=lambda key: self._decayed_score(self.entries[key], now))
+        for key in coldest[:len(self.entries) - self.max_entries + self.max_entries // 10]:
+            if self.entries[key].refreshing is None:
+                del self.entries[key]
+
+    def refresh(self, key, priority=BACKGROUND):
+        """
+        刷新一个key，同一key同时只有一个刷新任务
+        正在进行的刷新优先级更低时，以调用方的优先级重新抓取，不在低优先级队列里等待
+        :return: 刷新任务
+        """
+        entry = self.entries[key]
+        current = entry.refreshing
+        if current is not None and PRIORITIES.index(priority) >= PRIORITIES.index(entry.refresh_priority):
+            return current
+        if current is not None and not entry.waiters.get(current):
+            # 没有请求在等的低优先级刷新（后台刷新、预热）直接取消
+            current.cancel()
+        entry.refreshing = asyncio.create_task(self._refresh(entry, priority))
+        entry.refresh_priority = priority
+        return entry.refreshing
+
+    async def _refresh(self, entry, priority):
+        try:
+            ok, value = await entry.fetch(priority)
+            if ok:
+                entry.value = value
+                entry.fetched_at = time.time()
+            return ok, value
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"刷新缓存失败: {str(e)}")
+            return False, e
+        finally:
+            # 被更高优先级的刷新替换后不能清掉新任务
+            if entry.refreshing is asyncio.current_task():
+                entry.refreshing = None
+                entry.refresh_priority = None
+
+    async def get(self, key, fetch, priority):
+        """
+        读取缓存，没有可用数据时以调用方的优先级抓取
+        :param fetch: fetch(priority) -> 协程，返回 (是否成功, 值)，只缓存成功的结果
+        :return: (值, 状态)，状态为 hit / stale / miss / error，fetch抛出的异常原样抛出
+        """
+        entry = self._touch(key, fetch)
+        if entry.fetched_at is not None:
+            age = time.time() - entry.fetched_at
+            if age <= self.ttl:
+                return entry.value, 'hit'
+            if age <= self.max_stale:
+                self.refresh(key)
+                return entry.value, 'stale'
+        # 已有刷新时等它完成，不重复抓取；shield 避免一个调用方断开就取消其他调用方共享的刷新
+        task = self.refresh(key, priority)
+        entry.waiters[task] = entry.waiters.get(task, 0) + 1
+        try:
+            ok, value = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if entry.waiters[task] == 1:
+                task.cancel()
+            raise
+        finally:
+            entry.waiters[task] -= 1
+            if not entry.waiters[task]:
+                del entry.waiters[task]
+        if isinstance(value, Exception):
+            raise value
+        return value, 'miss' if ok else 'error'
+
+    def warm(self, budget, horizon):
+        """
+        按访问频率从高到低，刷新即将过期的数据
+        :param budget: 本轮最多发起的刷新数
+        :param horizon: 刷新在这么多秒内会过期的数据
+        :return: 发起的刷新数
+        """
+        now = time.time()
+        candidates = [
+            (self._decayed_score(entry, now), key) for key, entry in self.entries.items()
+            if entry.fetched_at is not None and entry.refreshing is None
+            and now - entry.fetched_at > self.ttl - horizon
+            and now - entry.fetched_at <= self.max_stale
+        ]
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        # 只刷新近期被多次访问的数据
+        hot = [key for score, key in candidates if score >= 2][:budget]
+        for key in hot:
+            self.refresh(key)
+        return len(hot)
+
+    async def run_warmer(self, interval, budget):
+        """
+        后台预热循环
+        :param interval: 每轮间隔秒数
+        :param budget: 每轮最多刷新数
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # 下一轮之前就会过期的数据本轮刷新
+                started = self.warm(budget, interval)
+                if started:
+                    logging.info(f"缓存预热: 刷新 {started} 条")
+                self._prune()
+            except Exception as e:
+                logging.warning(f"缓存预热出错: {str(e)}")
@@ -0,0 +1,460 @@
+from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException
+import websocket
+import itertools
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+# 与 create_driver 保持一致的启动参数
+CHROME_ARGS = [
+    '--headless=new',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--window-size=1920,1080',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-infobars',
+    '--disable-notifications',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--remote-allow-origins=*',
+    # --tabs 的其他标签页是同一窗口中的后台标签页，关闭后台节流，否则定时器和渲染都会被降速
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--disable-backgrounding-occluded-windows',
+    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+]
+
+CHROME_CANDIDATES = [
+    'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome',
+    r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+    r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+]
+
+# 页面内按定位方式查找元素，by取值与selenium的By一致
+FIND_ELEMENTS_FUNCTION = """
+function(by, value) {
+    var root = (this && this.nodeType) ? this : document;
+    if (by === 'class name') return Array.from(root.getElementsByClassName(value));
+    if (by === 'css selector') return Array.from(root.querySelectorAll(value));
+    if (by === 'id') return Array.from(root.querySelectorAll('#' + CSS.escape(value)));
+    if (by === 'tag name') return Array.from(root.getElementsByTagName(value));
+    if (by === 'name') return Array.from(root.querySelectorAll('[name="' + value + '"]'));
+    if (by === 'xpath') {
+        var result = document.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+        return nodes;
+    }
+    throw new Error('unsupported locator: ' + by);
+}
+"""
+
+# 与selenium get_attribute一致：优先取属性值(property)，没有时取HTML属性(attribute)
+GET_ATTRIBUTE_FUNCTION = """
+function(name) {
+    var value = this[name];
+    if (value === undefined || value === null || typeof value === 'object' || typeof value === 'function') {
+        value = this.getAttribute(name);
+    }
+    return value === null || value === undefined ? null : String(value);
+}
+"""
+
+OBJECT_GROUP = 'gmgn'
+
+def find_chrome():
+    """
+    查找Chrome可执行文件，可通过环境变量CHROME_PATH指定
+    """
+    if os.environ.get('CHROME_PATH'):
+        return os.environ['CHROME_PATH']
+    for candidate in CHROME_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    raise WebDriverException('找不到Chrome，请通过环境变量CHROME_PATH指定')
+
+class PendingCall:
+    """
+    一个已发送、等待响应的CDP命令
+    """
+    def __init__(self, method):
+        self.method = method
+        self._event = threading.Event()
+        self._message = None
+
+    def set(self, message):
+        self._message = message
+        self._event.set()
+
+    def result(self, timeout=30):
+        if not self._event.wait(timeout):
+            raise TimeoutException(f'CDP命令 {self.method} 超时')
+        if 'error' in self._message:
+            raise WebDriverException(f"{self.method}: {self._message['error'].get('message')}")
+        return self._message.get('result', {})
+
+class CDPConnection:
+    """
+    浏览器级DevTools websocket连接，所有标签页通过sessionId复用同一连接
+    后台线程读取消息，命令可以并发发送、批量等待
+    """
+    def __init__(self, ws_url):
+        self.ws = websocket.create_connection(ws_url, enable_multithread=True, suppress_origin=True)
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = {}
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def send_async(self, method, params=None, session_id=None):
+        """
+        发送命令但不等待响应
+        :return: PendingCall
+        """
+        call_id = next(self._ids)
+        call = PendingCall(method)
+        self._pending[call_id] = call
+        message = {'id': call_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        try:
+            self.ws.send(json.dumps(message))
+        except Exception as e:
+            self._pending.pop(call_id, None)
+            raise WebDriverException(f'发送CDP命令失败: {str(e)}')
+        return call
+
+    def send(self, method, params=None, session_id=None, timeout=30):
+        return self.send_async(method, params, session_id).result(timeout)
+
+    def on(self, session_id, method, callback):
+        """
+        订阅某个会话的CDP事件
+        """
+        self._listeners.setdefault((session_id, method), []).append(callback)
+
+    def _read_loop(self):
+        while True:
+            try:
+                message = json.loads(self.ws.recv())
+            except Exception as e:
+                if not self._closed:
+                    logging.error(f"CDP连接已断开: {str(e)}")
+                # 让所有等待中的命令立即失败
+                for call in list(self._pending.values()):
+                    call.set({'error': {'message': 'connection closed'}})
+                self._pending.clear()
+                return
+            if 'id' in message:
+                call = self._pending.pop(message['id'], None)
+                if call:
+                    call.set(message)
+                continue
+            for callback in self._listeners.get((message.get('sessionId'), message.get('method')), []):
+                try:
+                    callback(message.get('params', {}))
+                except Exception as e:
+                    logging.error(f"处理CDP事件 {message.get('method')} 出错: {str(e)}")
+
+    def close(self):
+        self._closed = True
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+class CDPElement:
+    """
+    页面元素，对应一个Runtime远程对象
+    """
+    def __init__(self, tab, object_id):
+        self.tab = tab
+        self.object_id = object_id
+
+    def _call(self, function, *args):
+        return self.tab._call_function(self.object_id, function, args)
+
+    def get_attribute(self, name):
+        return self._call(GET_ATTRIBUTE_FUNCTION, name)
+
+    @property
+    def text(self):
+        return self._call("function() { return this.innerText; }")
+
+    @property
+    def location(self):
+        return self._call("""function() {
+            var rect = this.getBoundingClientRect();
+            return {x: Math.round(rect.left + window.scrollX), y: Math.round(rect.top + window.scrollY)};
+        }""")
+
+    def click(self):
+        self._call("function() { this.click(); }")
+
+    def find_elements(self, by, value):
+        return self.tab._find_elements(by, value, self.object_id)
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f'找不到元素: {by}={value}')
+        return elements[0]
+
+class CDPTab:
+    """
+    一个标签页(target)，提供抓取脚本用到的WebDriver接口子集，
+    get_page_info 等函数可以直接使用
+    """
+    def __init__(self, browser, target_id, session_id, page_load_timeout=30):
+        self.browser = browser
+        self.connection = browser.connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.page_load_timeout = page_load_timeout
+        self._loaded = threading.Event()
+        self.connection.on(session_id, 'Page.loadEventFired', lambda params: self._loaded.set())
+        self.execute_batch([
+            ('Page.enable', {}),
+            ('Page.addScriptToEvaluateOnNewDocument', {
+                'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+            }),
+        ])
+
+    def send(self, method, params=None, timeout=30):
+        return self.connection.send(method, params, self.session_id, timeout)
+
+    def send_async(self, method, params=None):
+        return self.connection.send_async(method, params, self.session_id)
+
+    def execute_batch(self, commands, timeout=30):
+        """
+        一次性发送多条CDP命令后统一等待，只产生一次往返延迟
+        :param commands: [(method, params), ...]
+        :return: 结果列表
+        """
+        calls = [self.send_async(method, params) for method, params in commands]
+        return [call.result(timeout) for call in calls]
+
+    # ---- 导航 ----
+
+    def navigate(self, url):
+        """
+        开始导航但不等待加载完成，用于多标签页并发
+        """
+        self._loaded.clear()
+        # 释放上一个页面的元素引用，与导航一起发送
+        self.send_async('Runtime.releaseObjectGroup', {'objectGroup': OBJECT_GROUP})
+        result = self.send_async('Page.navigate', {'url': url}).result(self.page_load_timeout)
+        if result.get('errorText'):
+            raise WebDriverException(f"unknown error: {result['errorText']}")
+
+    def wait_loaded(self, timeout=None):
+        if not self._loaded.wait(timeout or self.page_load_timeout):
+            raise TimeoutException(f'页面加载超时 ({timeout or self.page_load_timeout}s)')
+
+    def get(self, url):
+        """
+        与selenium一致：导航并等待load事件
+        """
+        self.navigate(url)
+        self.wait_loaded()
+
+    # ---- 脚本执行 ----
+
+    @staticmethod
+    def _unwrap(result):
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            message = details.get('exception', {}).get('description') or details.get('text')
+            raise WebDriverException(f'javascript error: {message}')
+        return result.get('result', {}).get('value')
+
+    def _script_command(self, script, args):
+        """
+        将selenium风格的脚本（函数体 + arguments）转换为CDP命令
+        """
+        function = f"function() {{ {script}\n}}"
+        elements = [arg for arg in args if isinstance(arg, CDPElement)]
+        if elements:
+            return 'Runtime.callFunctionOn', {
+                'functionDeclaration': function,
+                'objectId': elements[0].object_id,
+                'arguments': [{'objectId': arg.object_id} if isinstance(arg, CDPElement) else {'value': arg} for arg in args],
+                'returnByValue': True,
+            }
+        return 'Runtime.evaluate', {
+            'expression': f"({function}).apply(null, {json.dumps(list(args))})",
+            'returnByValue': True,
+        }
+
+    def execute_script(self, script, *args):
+        method, params = self._script_command(script, args)
+        return self._unwrap(self.send(method, params))
+
+    def execute_scripts(self, scripts):
+        """
+        批量执行多段脚本，只等待一次
+        :param scripts: [(script, args), ...]
+        :return: 返回值列表
+        """
+        results = self.execute_batch([self._script_command(script, args) for script, args in scripts])
+        return [self._unwrap(result) for result in results]
+
+    def _call_function(self, object_id, function, args):
+        result = self.send('Runtime.callFunctionOn', {
+            'functionDeclaration': function,
+            'objectId': object_id,
+            'arguments': [{'value': arg} for arg in args],
+            'returnByValue': True,
+        })
+        return self._unwrap(result)
+
+    # ---- 元素查找 ----
+
+    def _find_elements(self, by, value, root_object_id=None):
+        if root_object_id:
+            result = self.send('Runtime.callFunctionOn', {
+                'functionDeclaration': FIND_ELEMENTS_FUNCTION,
+                'objectId': root_object_id,
+                'arguments': [{'value': by}, {'value': value}],
+                'objectGroup': OBJECT_GROUP,
+            })
+        else:
+            result = self.send('Runtime.evaluate', {
+                'expression': f"({FIND_ELEMENTS_FUNCTION}).call(document, {json.dumps(by)}, {json.dumps(value)})",
+                'objectGroup': OBJECT_GROUP,
+            })
+        if 'exceptionDetails' in result:
+            self._unwrap(result)
+        array_id = result['result'].get('objectId')
+        if not array_id:
+            return []
+        properties = self.send('Runtime.getProperties', {'objectId': array_id, 'ownProperties': True})
+        items = [(int(prop['name']), prop['value']['objectId']) for prop in properties.get('result', [])
+                 if prop['name'].isdigit() and prop.get('value', {}).get('objectId')]
+        return [CDPElement(self, object_id) for _, object_id in sorted(items)]
+
+    def find_elements(self, by, value):
+        return self._find_elements(by, value)
+
+    def find_element(self, by, value):
+        elements = self._find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f'找不到元素: {by}={value}')
+        return elements[0]
+
+    # ---- 页面属性 ----
+
+    @property
+    def title(self):
+        return self.execute_script('return document.title;')
+
+    @property
+    def current_url(self):
+        return self.execute_script('return location.href;')
+
+    @property
+    def page_source(self):
+        return self.execute_script('return document.documentElement.outerHTML;')
+
+    @property
+    def window_handles(self):
+        return [self.target_id]
+
+    def close(self):
+        """
+        关闭当前标签页
+        """
+        try:
+            self.browser.connection.send('Target.closeTarget', {'targetId': self.target_id})
+        except WebDriverException:
+            pass
+        if self in self.browser.tabs:
+            self.browser.tabs.remove(self)
+
+    def quit(self):
+        """
+        与selenium一致：结束整个浏览器
+        """
+        self.browser.quit()
+
+class CDPBrowser:
+    """
+    直接通过DevTools协议控制的无头Chrome，不经过chromedriver
+    """
+    def __init__(self, process, user_data_dir, ws_url):
+        self.process = process
+        self.user_data_dir = user_data_dir
+        self.connection = CDPConnection(ws_url)
+        self.tabs = []
+        # 启动时自带的空白页，第一个标签页直接复用
+        targets = self.connection.send('Target.getTargets').get('targetInfos', [])
+        self._spare_targets = [target['targetId'] for target in targets if target.get('type') == 'page']
+
+    @classmethod
+    def launch(cls, chrome_path=None, extra_args=(), startup_timeout=30):
+        """
+        启动Chrome并连接其DevTools websocket
+        """
+        user_data_dir = tempfile.mkdtemp(prefix='gmgn-cdp-')
+        args = [chrome_path or find_chrome(), '--remote-debugging-port=0', f'--user-data-dir={user_data_dir}']
+        args += CHROME_ARGS + list(extra_args) + ['about:blank']
+        process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # Chrome启动后会把实际端口和websocket路径写入DevToolsActivePort
+        port_file = os.path.join(user_data_dir, 'DevToolsActivePort')
+        deadline = time.time() + startup_timeout
+        while True:
+            try:
+                with open(port_file, 'r') as f:
+                    lines = f.read().split('\n')
+                if len(lines) >= 2 and lines[1]:
+                    break
+            except OSError:
+                pass
+            if process.poll() is not None or time.time() > deadline:
+                process.kill()
+                shutil.rmtree(user_data_dir, ignore_errors=True)
+                raise WebDriverException('Chrome启动失败')
+            time.sleep(0.1)
+
+        return cls(process, user_data_dir, f"ws://127.0.0.1:{lines[0].strip()}{lines[1].strip()}")
+
+    def new_tab(self, page_load_timeout=30):
+        """
+        打开一个新的标签页并附加会话
+        """
+        if self._spare_targets:
+            target_id = self._spare_targets.pop()
+        else:
+            target_id = self.connection.send('Target.createTarget', {'url': 'about:blank'})['targetId']
+        session_id = self.connection.send('Target.attachToTarget', {'targetId': target_id, 'flatten': True})['sessionId']
+        tab = CDPTab(self, target_id, session_id, page_load_timeout)
+        self.tabs.append(tab)
+        return tab
+
+    def quit(self):
+        try:
+            self.connection.send('Browser.close', timeout=5)
+        except Exception:
+            pass
+        self.connection.close()
+        try:
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+def create_cdp_driver():
+    """
+    创建直连DevTools的驱动，返回可直接传给get_page_info的标签页
+    """
+    return CDPBrowser.launch().new_tab()
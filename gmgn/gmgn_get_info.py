@@ -11,10 +11,19 @@ import time
 import random
 import logging
 import gc
+import heapq
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from webdriver_manager.chrome import ChromeDriverManager
 import csv
 import os
+import signal
+import sys
 import argparse  # 添加argparse模块
+from gmgn_selectors import SelectorRegistry, INFO_SELECTORS
+from gmgn_snapshots import SnapshotStore
+from gmgn_profiling import Profiler
 
 # 配置日志
 logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -26,10 +35,16 @@ logging.getLogger('selenium').setLevel(logging.WARNING)
 # 设置 urllib3 的日志级别为 WARNING
 logging.getLogger('urllib3').setLevel(logging.WARNING)
 
-def create_driver():
+def create_driver(backend='selenium'):
     """
     创建并配置Undetected ChromeDriver，增强反检测能力
+    :param backend: selenium 或 cdp
     """
+    if backend == 'cdp':
+        # 直连DevTools websocket，不经过chromedriver
+        from gmgn_cdp import create_cdp_driver
+        return create_cdp_driver()
+
     # 禁用 webdriver manager 的日志
     os.environ['WDM_LOG_LEVEL'] = '0'
     
@@ -112,16 +127,65 @@ def random_sleep(min_seconds=1, max_seconds=3):
     """随机延迟函数"""
     time.sleep(random.uniform(min_seconds, max_seconds))
 
-def get_element_text(driver, class_name, include_children=False):
+# 字段定位注册表
+SELECTORS = SelectorRegistry(INFO_SELECTORS)
+PROBE_LOCK = threading.Lock()
+
+# 多标签页并发时保护结果输出
+OUTPUT_LOCK = threading.Lock()
+
+# 抓取时保存页面快照的SnapshotStore，None表示不保存
+CAPTURE_STORE = None
+
+# 获取元素的直接文本内容，不包含子元素
+DIRECT_TEXT_SCRIPT = """
+    var element = arguments[0];
+    return Array.from(element.childNodes)
+        .filter(node => node.nodeType === 3)
+        .map(node => node.textContent.trim())
+        .join(' ');
+"""
+
+# 按候选定位方式查找字段并返回全部元素的文本，arguments[0] 为 [[by, value], ...]，arguments[1] 为是否包含子元素
+# 返回 [命中的定位方式序号, 文本列表]，都找不到时返回null
+FIELD_TEXT_SCRIPT = """
+    function find(by, value) {
+        if (by === 'class name') return Array.from(document.getElementsByClassName(value));
+        if (by === 'css selector') return Array.from(document.querySelectorAll(value));
+        if (by === 'xpath') {
+            var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+            return nodes;
+        }
+        return [];
+    }
+    var candidates = arguments[0], includeChildren = arguments[1];
+    for (var i = 0; i < candidates.length; i++) {
+        var elements = find(candidates[i][0], candidates[i][1]);
+        if (elements.length) {
+            return [i, elements.map(function(element) {
+                if (includeChildren) return element.innerText;
+                return Array.from(element.childNodes)
+                    .filter(node => node.nodeType === 3)
+                    .map(node => node.textContent.trim())
+                    .join(' ');
+            })];
+        }
+    }
+    return null;
+"""
+
+def get_element_text(driver, field, include_children=False):
     """
-    获取指定class元素的文本
+    获取指定字段元素的文本
     :param driver: WebDriver实例
-    :param class_name: CSS类
+    :param field: SELECTORS中的字段名
     :param include_children: 是否包含子元素文本
     :return: 元素文本或None
     """
     try:
-        elements = driver.find_elements(By.CLASS_NAME, class_name)
+        elements = SELECTORS.find_elements(driver, field)
         if not elements:
             return None
         
@@ -131,79 +195,303 @@ def get_element_text(driver, class_name, include_children=False):
                 return element.get_attribute('innerText').strip()
             else:
                 # 获取直接文本内容，不包含子元素
-                return driver.execute_script("""
-                    var element = arguments[0];
-                    return Array.from(element.childNodes)
-                        .filter(node => node.nodeType === 3)
-                        .map(node => node.textContent.trim())
-                        .join(' ');
-                """, element).strip()
+                return driver.execute_script(DIRECT_TEXT_SCRIPT, element).strip()
         
         # 果有多个元素，返回列表
         if include_children:
             return [element.get_attribute('innerText').strip() for element in elements]
         else:
-            return [driver.execute_script("""
-                var element = arguments[0];
-                return Array.from(element.childNodes)
-                    .filter(node => node.nodeType === 3)
-                    .map(node => node.textContent.trim())
-                    .join(' ');
-            """, element).strip() for element in elements]
+            return [driver.execute_script(DIRECT_TEXT_SCRIPT, element).strip() for element in elements]
     except:
         return None
 
+# 失败类型
+ERROR_TIMEOUT = 'timeout'             # 页面或关键元素加载超时
+ERROR_SELECTOR = 'selector_missing'   # 页面已加载但关键元素不存在
+ERROR_BLOCKED = 'blocked'             # 被验证/拦截页面挡住
+ERROR_NAVIGATION = 'navigation'       # 导航失败、页面不存在等
+ERROR_EMPTY = 'empty'                 # 钱包没有任何数据
+
+# 拦截页面与无效页面的特征文本（小写）
+BLOCK_MARKERS = ('just a moment', 'attention required', 'verify you are human', 'cf-challenge', 'access denied')
+NOT_FOUND_MARKERS = ('404', 'page not found', 'not found', '页面不存在', '地址无效', 'invalid address')
+# 正文中的特征文本，只在页面稳定且没有关键元素时判断，避免误判
+NOT_FOUND_TEXT_MARKERS = ('page not found', '页面不存在', '地址无效', 'invalid address')
+EMPTY_MARKERS = ('no data', 'no record', 'no activity', 'no transactions', '暂无数据', '暂无记录')
+
+# 一次往返获取页面状态，避免逐个命令轮询
+# arguments[0] 为关键元素的候选定位方式 [[by, value], ...]
+PAGE_PROBE_SCRIPT = """
+    function exists(by, value) {
+        if (by === 'class name') return document.getElementsByClassName(value).length > 0;
+        if (by === 'css selector') return document.querySelector(value) !== null;
+        if (by === 'xpath') return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+        return false;
+    }
+    var body = document.body;
+    return {
+        readyState: document.readyState,
+        title: document.title || '',
+        text: body ? body.innerText.slice(0, 2000) : '',
+        hasAnchor: arguments[0].some(function(locator) { return exists(locator[0], locator[1]); })
+    };
+"""
+
+class PageLoadError(Exception):
+    """
+    页面获取失败，带有失败类型以及是否值得稍后重试
+    """
+    def __init__(self, kind, message, retryable, max_attempts=None):
+        """
+        :param max_attempts: 该类失败最多尝试的次数，None表示使用重试队列的设置
+        """
+        super().__init__(message)
+        self.kind = kind
+        self.retryable = retryable
+        self.max_attempts = max_attempts
+
+def probe_page(driver, anchor_field):
+    """
+    探测当前页面状态
+    :return: 包含 readyState/title/text/hasAnchor 的字典，失败时返回None
+    """
+    try:
+        return driver.execute_script(PAGE_PROBE_SCRIPT, SELECTORS.anchor_candidates(anchor_field))
+    except Exception:
+        return None
+
+def classify_page(state, settled=False):
+    """
+    根据探测结果判断页面是否已无法成功
+    :param settled: 页面已加载完成且正文在一段时间内没有变化；
+                    加载中的表格、骨架屏也会显示"No data"，正文特征只在页面稳定后判断
+    :return: PageLoadError 或 None
+    """
+    if not state:
+        return None
+    title = (state.get('title') or '').lower()
+    text = (state.get('text') or '').lower()
+    if any(marker in title or marker in text[:500] for marker in BLOCK_MARKERS):
+        return PageLoadError(ERROR_BLOCKED, f"被拦截页面挡住: {state.get('title')}", True)
+    if any(marker in title for marker in NOT_FOUND_MARKERS):
+        return PageLoadError(ERROR_NAVIGATION, f"页面不存在: {state.get('title')}", False)
+    if settled and state.get('readyState') == 'complete' and not state.get('hasAnchor'):
+        if any(marker in text for marker in NOT_FOUND_TEXT_MARKERS):
+            return PageLoadError(ERROR_NAVIGATION, "页面不存在", False)
+        if any(marker in text for marker in EMPTY_MARKERS):
+            return PageLoadError(ERROR_EMPTY, "钱包没有数据", False)
+    return None
+
+def wait_for_page(driver, anchor_field, timeout=30, selector_grace=25, stable_window=5, poll_interval=0.5):
+    """
+    等待关键元素出现，同时尽早识别注定失败的页面
+    钱包数据在load事件之后才通过接口加载，所以各种容忍时间都从页面稳定（加载完成且正文不再变化）开始计算
+    :param anchor_field: 关键元素在SELECTORS中的字段名
+    :param timeout: 总超时时间
+    :param selector_grace: 页面稳定后仍找不到关键元素的容忍时间
+    :param stable_window: 正文保持不变多久才按正文判断页面不存在/没有数据
+    """
+    deadline = time.time() + timeout
+    last_text = None
+    stable_since = None
+    while True:
+        state = probe_page(driver, anchor_field)
+        if state and state.get('hasAnchor'):
+            return
+        now = time.time()
+        if state and state.get('readyState') == 'complete':
+            if stable_since is None or state.get('text') != last_text:
+                stable_since = now
+                last_text = state.get('text')
+        else:
+            stable_since = None
+        stable_for = now - stable_since if stable_since is not None else 0
+        error = classify_page(state, settled=stable_for >= stable_window)
+        if error:
+            raise error
+        if stable_for > selector_grace:
+            # 可能只是渲染较慢，允许重试一次
+            raise PageLoadError(ERROR_SELECTOR, f"页面已稳定但找不到关键元素 {anchor_field}", True, max_attempts=2)
+        if now > deadline:
+            raise PageLoadError(ERROR_TIMEOUT, f"等待页面加载超时 ({timeout}s)", True)
+        time.sleep(poll_interval)
+
+def fetch_page_info(driver, url, original_address):
+    """
+    获取单个页面的信息，失败时抛出PageLoadError
+    """
+    try:
+        driver.get(url)
+    except TimeoutException as e:
+        raise PageLoadError(ERROR_TIMEOUT, f"页面导航超时: {e.msg}", True)
+    except WebDriverException as e:
+        raise PageLoadError(ERROR_NAVIGATION, f"页面导航失败: {e.msg}", True)
+
+    # 模拟人类滚动行为（页面可能尚未加载完成，使用documentElement避免body为空）
+    driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight/2);")
+
+    # 等待关键元素出现，无法成功的页面会被提前识别
+    wait_for_page(driver, 'anchor')
+
+    # 随机延迟，模拟人类行为；放在等待之后，注定失败的页面不用白等
+    random_sleep(1, 2)
+
+    # 在第一个成功加载的页面上验证所有字段，失效字段之后直接跳过
+    with PROBE_LOCK:
+        if not SELECTORS.probed:
+            SELECTORS.probe(driver)
+
+    # 保存渲染后的DOM，之后可离线重新提取
+    if CAPTURE_STORE is not None:
+        try:
+            CAPTURE_STORE.put(url, driver.page_source)
+        except Exception as e:
+            logging.warning(f"保存地址 {url} 的快照失败: {str(e)}")
+
+    return extract_page_info(driver, url, original_address)
+
+def read_fields(driver, reads):
+    """
+    批量读取多个字段的文本
+    驱动支持 execute_scripts（CDP）时所有字段在一次往返内完成，否则逐个调用 get_element_text
+    :param reads: [(字段, 是否包含子元素), ...]
+    :return: {(字段, 是否包含子元素): 文本/文本列表/None}
+    """
+    reads = list(dict.fromkeys(reads))
+    if not hasattr(driver, 'execute_scripts'):
+        return {read: get_element_text(driver, *read) for read in reads}
+
+    pending = [read for read in reads if not SELECTORS.is_broken(read[0])]
+    try:
+        results = driver.execute_scripts([
+            (FIELD_TEXT_SCRIPT, (SELECTORS.anchor_candidates(field), include_children))
+            for field, include_children in pending
+        ])
+    except Exception as e:
+        logging.warning(f"批量读取字段失败，改为逐个读取: {str(e)}")
+        return {read: get_element_text(driver, *read) for read in reads}
+
+    values = dict.fromkeys(reads)
+    for (field, include_children), result in zip(pending, results):
+        if not result:
+            continue
+        index, texts = result
+        SELECTORS.resolved[field] = tuple(SELECTORS.locators(field)[index])
+        texts = [(text or '').strip() for text in texts]
+        values[(field, include_children)] = texts[0] if len(texts) == 1 else texts
+    return values
+
+def extract_page_info(driver, url, original_address):
+    """
+    从已加载完成的页面中提取信息，不做导航和等待
+    """
+    texts = read_fields(driver, [
+        ('recent_7d_profit_percentage', False), ('recent_7d_profit_amount', False), ('win_rate', False),
+        ('total_trades_current', False), ('total_trades_target', False), ('total_profit_loss', True),
+        ('unrealized_profit', False), ('buy_cost', False), ('buy_cost', True), ('token_balance', True),
+    ])
+
+    def text(field, include_children=False):
+        return texts[(field, include_children)] or "/"
+
+    page_info = {
+        'url': url,
+        'address': original_address,  # 添加原始地址
+        'recent_7d_profit': {
+            'percentage': text('recent_7d_profit_percentage'),
+            'amount': text('recent_7d_profit_amount')
+        },
+        'win_rate': text('win_rate'),
+        'total_trades': {
+            'current': text('total_trades_current'),
+            'target': text('total_trades_target'),
+        },
+        'total_profit_loss': text('total_profit_loss', True),
+        'unrealized_profit': text('unrealized_profit'),
+        'buy_cost': {
+            'total': text('buy_cost'),
+            'average': text('buy_cost', True),
+        },
+        'avg_realized_profit': text('total_profit_loss', True),
+        'token_balance': text('token_balance', True).replace('\n', ''),
+    }
+
+    return page_info
+
 def get_page_info(driver, url, original_address):
     """
     获取单个页面的信息
     """
     try:
-        #logging.info(f"正在访问: {url}")
-        driver.get(url)
-        
-        # 随机延迟，模拟人类行为
-        random_sleep(1, 2)
-        
-        # 等待页面加载
-        wait = WebDriverWait(driver, 30)
-        wait.until(lambda d: d.execute_script('return document.readyState') == 'complete')
-        
-        # 模拟人类滚动行为
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-        random_sleep(1, 2)
-        
-        # 等待关键元素出现
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, 'css-6hgaua')))
-        
-        # 获取基本信息
-        page_info = {
-            'url': url,
-            'address': original_address,  # 添加原始地址
-            'recent_7d_profit': {
-                'percentage': get_element_text(driver, 'css-18pbzhy') or "/",
-                'amount': get_element_text(driver, 'css-vi0yzx') or "/"
-            },
-            'win_rate': get_element_text(driver, 'css-3h278t') or "/",
-            'total_trades': {
-                'current': get_element_text(driver, 'css-131utnt') or "/",
-                'target': get_element_text(driver, 'css-159dfc2') or "/",
-            },
-            'total_profit_loss': get_element_text(driver, 'css-1pjn4fe', True) or "/",
-            'unrealized_profit': get_element_text(driver, 'css-1ki3vv4') or "/",
-            'buy_cost': {
-                'total': get_element_text(driver, 'css-13k40wa') or "/",
-                'average': get_element_text(driver, 'css-13k40wa', True) or "/",
-            },
-            'avg_realized_profit': get_element_text(driver, 'css-1pjn4fe', True) or "/",
-            'token_balance': (get_element_text(driver, 'css-qq3v8v', True) or "/").replace('\n', ''),
-        }
-        
-        return page_info
-        
+        return fetch_page_info(driver, url, original_address)
+    except PageLoadError as e:
+        logging.error(f"获取地址 {url} 信息失败 [{e.kind}]: {str(e)}")
+        return None
     except Exception as e:
         logging.error(f"获取地址 {url} 信息时发生错误: {str(e)}")
         return None
 
+class RetryQueue:
+    """
+    延迟重试队列：可重试的失败按指数退避推迟，不阻塞后续地址
+    """
+    def __init__(self, max_attempts=3, budget=None, base_delay=5, max_delay=120):
+        """
+        :param max_attempts: 单个地址的最大尝试次数（含首次）
+        :param budget: 整次运行允许的重试总数，None表示不限
+        :param base_delay: 首次重试的等待秒数，之后每次翻倍
+        :param max_delay: 单次等待上限
+        """
+        self.max_attempts = max_attempts
+        self.budget = budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._heap = []
+        self._counter = 0
+        # 多标签页模式下会被多个线程同时使用
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
+
+    def defer(self, url, address, attempt, error):
+        """
+        安排一次重试
+        :param attempt: 已经尝试的次数
+        :return: 是否成功加入队列
+        """
+        if not error.retryable or attempt >= min(self.max_attempts, error.max_attempts or self.max_attempts):
+            return False
+        with self._lock:
+            if self.budget is not None:
+                if self.budget <= 0:
+                    return False
+                self.budget -= 1
+            delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+            delay *= random.uniform(0.8, 1.2)
+            self._counter += 1
+            heapq.heappush(self._heap, (time.time() + delay, self._counter, url, address, attempt))
+        return True
+
+    def pop_ready(self, wait=False):
+        """
+        取出一个到期的重试项
+        :param wait: 没有到期项时是否等待最早的一项
+        :return: (url, address, attempt) 或 None
+        """
+        while True:
+            with self._lock:
+                if not self._heap:
+                    return None
+                delay = self._heap[0][0] - time.time()
+                if delay <= 0:
+                    _, _, url, address, attempt = heapq.heappop(self._heap)
+                    return url, address, attempt
+                if not wait:
+                    return None
+            time.sleep(delay)
+
 def read_addresses_from_file(filename):
     """
     从文件中读取地址列表
@@ -234,21 +522,131 @@ def print_page_info(page_info):
     csv_line = f"{page_info['address']},{page_info['win_rate']},{page_info['total_trades']['current']}/{page_info['total_trades']['target']},{page_info['recent_7d_profit']['percentage']} ({page_info['recent_7d_profit']['amount']}),{page_info['token_balance']}"
     print(csv_line)
 
-def process_batch(driver, urls, addresses):
+def visit_address(driver, url, address, attempt, retry_queue, results):
+    """
+    访问单个地址，失败时按类型决定是否放入重试队列
+    """
+    try:
+        result = fetch_page_info(driver, url, address)
+    except PageLoadError as e:
+        if retry_queue is not None and retry_queue.defer(url, address, attempt, e):
+            logging.warning(f"地址 {address} 获取失败 [{e.kind}]，稍后重试 (第 {attempt} 次): {str(e)}")
+        else:
+            logging.error(f"获取地址 {url} 信息失败 [{e.kind}]: {str(e)}")
+            with OUTPUT_LOCK:
+                print(f"获取地址 {address} 的信息失败 ({e.kind})")
+        return
+    except Exception as e:
+        logging.error(f"获取地址 {url} 信息时发生错误: {str(e)}")
+        with OUTPUT_LOCK:
+            print(f"获取地址 {address} 的信息失败")
+        return
+    # 多标签页并发时保证每行输出完整
+    with OUTPUT_LOCK:
+        results.append(result)
+        print_page_info(result)
+
+def process_batch(driver, urls, addresses, retry_queue=None):
     """
     处理一批URL，每处理一个地址就立即显示结果
+    可重试的失败进入retry_queue，在地址之间穿插处理已到期的重试
     """
     results = []
     for url, address in zip(urls, addresses):
         #print(f"\n正在获取地址 {address} 的信息...")
-        result = get_page_info(driver, url, address)
-        if result:
-            results.append(result)
-            print_page_info(result)
-        else:
-            print(f"获取地址 {address} 的信息失败")
+        visit_address(driver, url, address, 1, retry_queue, results)
         random_sleep(1, 2)  # 在请求之间添加随机延迟
-    
+
+        if retry_queue is not None:
+            item = retry_queue.pop_ready()
+            if item:
+                retry_url, retry_address, attempt = item
+                visit_address(driver, retry_url, retry_address, attempt + 1, retry_queue, results)
+                random_sleep(1, 2)
+
+    return results
+
+def process_tabs(browser, urls, addresses, tab_count, retry_queue=None, profiler=None):
+    """
+    在同一个浏览器中用多个标签页并发处理地址（仅cdp后端）
+    每个标签页独立导航、独立等待就绪，哪个先加载完成就先提取哪个
+    :param browser: CDPBrowser实例
+    :param tab_count: 标签页数量
+    :param profiler: --profile 的Profiler，记录每个标签页的命令并采样工作线程
+    """
+    tabs = list(browser.tabs[:tab_count])
+    while len(tabs) < tab_count:
+        tabs.append(browser.new_tab())
+
+    work = deque(zip(urls, addresses))
+    work_lock = threading.Lock()
+    results = []
+
+    def next_item():
+        with work_lock:
+            item = retry_queue.pop_ready() if retry_queue is not None else None
+            if item:
+                url, address, attempt = item
+                return url, address, attempt + 1
+            if work:
+                url, address = work.popleft()
+                return url, address, 1
+        return None
+
+    def run_tab(tab):
+        if profiler:
+            tab = profiler.wrap(tab)
+        while True:
+            item = next_item()
+            if item is None:
+                # 没有新地址时由main统一处理剩余的重试
+                return
+            url, address, attempt = item
+            visit_address(tab, url, address, attempt, retry_queue, results)
+            random_sleep(1, 2)  # 每个标签页在请求之间添加随机延迟
+
+    with ThreadPoolExecutor(max_workers=tab_count) as executor:
+        if profiler:
+            futures = [executor.submit(profiler.run_thread, run_tab, tab) for tab in tabs]
+        else:
+            futures = [executor.submit(run_tab, tab) for tab in tabs]
+        for future in futures:
+            future.result()
+
+    # 只保留一个标签页，释放内存
+    for tab in tabs[1:]:
+        tab.close()
+    return results
+
+def replay_addresses(store, urls, addresses):
+    """
+    在保存的快照上重新提取信息，不启动浏览器也不访问网络
+    """
+    results = []
+    for url, address in zip(urls, addresses):
+        try:
+            driver = store.open(url)
+        except Exception as e:
+            logging.error(f"读取地址 {url} 的快照失败: {str(e)}")
+            driver = None
+        if driver is None:
+            print(f"获取地址 {address} 的信息失败 (no snapshot)")
+            continue
+        if not SELECTORS.probed:
+            SELECTORS.probe(driver)
+        result = extract_page_info(driver, url, address)
+        results.append(result)
+        print_page_info(result)
+    return results
+
+def drain_retry_queue(driver, retry_queue):
+    """
+    所有地址处理完后，按到期时间处理剩余的重试
+    """
+    results = []
+    while len(retry_queue):
+        url, address, attempt = retry_queue.pop_ready(wait=True)
+        visit_address(driver, url, address, attempt + 1, retry_queue, results)
     return results
 
 def save_to_csv(results, filename='results.csv', max_retries=3):
@@ -290,10 +688,22 @@ def save_to_csv(results, filename='results.csv', max_retries=3):
     return False
 
 def main():
+    global CAPTURE_STORE
+
     # 设置命令行参数解析
     parser = argparse.ArgumentParser(description='获取GMGN地址信息')
     parser.add_argument('-i', '--input', type=str, nargs='+', required=True, help='���查询的钱包地址，可输入多个地址，以空格分隔')
+    parser.add_argument('--max-attempts', type=int, default=3, help='单个地址的最大尝试次数 (默认: 3)')
+    parser.add_argument('--backend', choices=['selenium', 'cdp'], default=os.environ.get('GMGN_BACKEND', 'selenium'), help='浏览器驱动后端 (默认: selenium，可用环境变量GMGN_BACKEND设置)')
+    parser.add_argument('--retry-budget', type=int, default=None, help='整次运行允许的重试总数 (默认: 不限)')
+    parser.add_argument('--tabs', type=int, default=1, help='同一浏览器内并发的标签页数量，需要 --backend cdp (默认: 1)')
+    parser.add_argument('--capture', type=str, default=None, help='将渲染后的页面保存到指定快照目录')
+    parser.add_argument('--replay', type=str, default=None, help='不启动浏览器，从指定快照目录重新提取')
+    parser.add_argument('--profile', type=str, nargs='?', const='profile_gmgn_get_info', default=None, help='记录cProfile和WebDriver命令跟踪，输出到 <前缀>.prof 和 <前缀>.trace.jsonl，汇总打印到stderr')
     args = parser.parse_args()
+
+    if args.tabs > 1 and args.backend != 'cdp':
+        parser.error('--tabs 大于1时需要 --backend cdp')
     
     base_url = "https://gmgn.ai/sol/address"
     
@@ -307,23 +717,62 @@ def main():
     # 将地址列表转换为URL列表
     urls = [f"{base_url.rstrip('/')}/{address.lstrip('/')}" for address in address_list]
     
+    profiler = Profiler(args.profile) if args.profile else None
+    if profiler:
+        profiler.start()
+
+    # 回放模式：直接在快照上提取
+    if args.replay:
+        try:
+            results = replay_addresses(SnapshotStore(args.replay), urls, address_list)
+            if not save_to_csv(results):
+                logging.error("保存结果失败")
+        finally:
+            if profiler:
+                profiler.finish()
+        return
+
+    if args.capture:
+        CAPTURE_STORE = SnapshotStore(args.capture)
+
     # 创建一个浏览器实例
     driver = None
+
+    def stop(signum, frame):
+        # server取消任务时发送SIGTERM，退出后由finally关闭浏览器
+        logging.info("接收到终止信号，正在关闭程序...")
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    if hasattr(signal, 'SIGBREAK'):
+        signal.signal(signal.SIGBREAK, stop)
+
     try:
-        driver = create_driver()
+        driver = create_driver(args.backend)
+        if profiler:
+            driver = profiler.wrap(driver)
         # 存所有结果
         all_results = []
+        retry_queue = RetryQueue(max_attempts=args.max_attempts, budget=args.retry_budget)
         
-        # 每次处理2个URL（减少批量大小，降低被检测风险）
-        batch_size = 2
-        for i in range(0, len(urls), batch_size):
-            batch_urls = urls[i:i + batch_size]
-            batch_addresses = address_list[i:i + batch_size]
-            #print(f"\n正在处理第 {i//batch_size + 1} 批地址...")
-            
-            # 处理这一批URL
-            batch_results = process_batch(driver, batch_urls, batch_addresses)
-            all_results.extend(batch_results)
+        if args.tabs > 1:
+            # 同一浏览器内多个标签页并发处理
+            all_results.extend(process_tabs(driver.browser, urls, address_list, args.tabs, retry_queue, profiler))
+        else:
+            # 每次处理2个URL（减少批量大小，降低被检测风险）
+            batch_size = 2
+            for i in range(0, len(urls), batch_size):
+                batch_urls = urls[i:i + batch_size]
+                batch_addresses = address_list[i:i + batch_size]
+                #print(f"\n正在处理第 {i//batch_size + 1} 批地址...")
+                
+                # 处理这一批URL
+                batch_results = process_batch(driver, batch_urls, batch_addresses, retry_queue)
+                all_results.extend(batch_results)
+
+        # 处理剩余的延迟重试
+        all_results.extend(drain_retry_queue(driver, retry_queue))
         
         # 输出结果到CSV文件
         if not save_to_csv(all_results):
@@ -333,6 +782,8 @@ def main():
         logging.error(f"程序执行出错: {str(e)}")
     finally:
         cleanup_driver(driver)
+        if profiler:
+            profiler.finish()
         gc.collect()  # 强制垃圾回收
         
 if __name__ == "__main__":
@@ -16,6 +16,10 @@ from webdriver_manager.chrome import ChromeDriverManager
 import signal
 import atexit
 import sys
+import os
+from gmgn_selectors import SelectorRegistry, URL_SELECTORS
+from gmgn_snapshots import SnapshotStore
+from gmgn_profiling import Profiler
 
 # Create a filter to exclude the specific message
 class MessageFilter(logging.Filter):
@@ -45,10 +49,16 @@ class CustomChrome(uc.Chrome):
         except:
             pass
         
-def create_driver():
+def create_driver(backend='selenium'):
     """
     创建并配置Undetected ChromeDriver，增强反检测能力
+    :param backend: selenium 或 cdp
     """
+    if backend == 'cdp':
+        # 直连DevTools websocket，不经过chromedriver
+        from gmgn_cdp import create_cdp_driver
+        return create_cdp_driver()
+
     options = uc.ChromeOptions()
     
     # 启用无头模式
@@ -127,6 +137,12 @@ def random_sleep(min_seconds=1, max_seconds=3):
     """随机延迟函数"""
     time.sleep(random.uniform(min_seconds, max_seconds))
 
+# 字段定位注册表
+SELECTORS = SelectorRegistry(URL_SELECTORS)
+
+# 抓取时保存页面快照的SnapshotStore，None表示不保存
+CAPTURE_STORE = None
+
 def scroll_to_position(driver, y_position):
     """
     滚动到指定位置并等待
@@ -159,19 +175,22 @@ def scroll_to_element(driver, element):
         logging.error(f"滚动到元素失败: {str(e)}")
         return False
 
-def get_element_text(driver, class_name, max_count, include_children=False):
+def get_element_text(driver, field, max_count, include_children=False):
     """
-    获取指定class元素的href值
+    获取指定字段元素的href值
     :param driver: WebDriver实例
-    :param class_name: 目标元素的class名
+    :param field: SELECTORS中的字段名
     :param max_count: 最大获取数量
     :param include_children: 是否包含子元素本
     :return: 提取的地址列表
     """
+    # 已失效的字段直接跳过，不再等待
+    if SELECTORS.is_broken(field):
+        return []
     try:
         # 等待元素加载
         wait = WebDriverWait(driver, 10)
-        elements = wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'css-4949n9')))
+        elements = wait.until(lambda d: SELECTORS.find_elements(d, field))
         
         # 获取指定数量的元素的href值
         addresses = []
@@ -195,21 +214,24 @@ def click_blue_chip_holders_tab(driver):
     """
     等待并点击持有者标签
     """
+    if SELECTORS.is_broken('holders_tab'):
+        logging.error("持有者标签的所有定位方式均失效")
+        return False
     try:
         # 等待页面加载完成
         wait = WebDriverWait(driver, 10)
         
         # 检查是否存在模态框，如果存在则尝试关闭
         try:
-            modal = wait.until(EC.presence_of_element_located((By.CLASS_NAME, 'chakra-modal__content-container')))
+            modals = wait.until(lambda d: SELECTORS.find_elements(d, 'modal'))
             # 尝试点击模态框外部区域来关闭它
-            driver.execute_script("arguments[0].parentElement.click();", modal)
+            driver.execute_script("arguments[0].parentElement.click();", modals[0])
             time.sleep(1)  # 等待模态框消失
         except:
             pass  # 如果没有模态框，继续执行
         
         # 等待标签出现并确保可见
-        tab = wait.until(EC.presence_of_element_located((By.XPATH, "//button[contains(@class, 'chakra-tabs__tab') and .//div[contains(text(), '持有者')]]")))
+        tab = wait.until(lambda d: SELECTORS.find_elements(d, 'holders_tab'))[0]
         
         # 使用JavaScript点击元素，这样可以避免元素被遮挡的问题
         driver.execute_script("arguments[0].click();", tab)
@@ -243,10 +265,24 @@ def get_page_info(driver, url, max_count):
             return None
         
         # 等待目标元素出现
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, 'css-f8qc29')))
+        if SELECTORS.is_broken('holder_row'):
+            logging.error("持有者列表的所有定位方式均失效")
+            return None
+        wait.until(lambda d: SELECTORS.find_elements(d, 'holder_row'))
+
+        # 在第一个成功加载的页面上验证所有字段
+        if not SELECTORS.probed:
+            SELECTORS.probe(driver, ['holder_row', 'holder_link', 'holders_tab'])
+
+        # 保存点击标签后的DOM，之后可离线重新提取
+        if CAPTURE_STORE is not None:
+            try:
+                CAPTURE_STORE.put(url, driver.page_source)
+            except Exception as e:
+                logging.warning(f"保存 {url} 的快照失败: {str(e)}")
         
         # 获取有钱包地址
-        wallet_addresses = get_element_text(driver, 'css-f8qc29', max_count)
+        wallet_addresses = get_element_text(driver, 'holder_link', max_count)
         
         page_info = {
             'url': url,
@@ -302,6 +338,8 @@ def main():
     # 注册信号处理器
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    if hasattr(signal, 'SIGBREAK'):
+        signal.signal(signal.SIGBREAK, signal_handler)
     
     # 注册清理函数
     atexit.register(cleanup)
@@ -312,6 +350,14 @@ def main():
                       help='代币地址')
     parser.add_argument('-n', '--number', type=int, default=100,
                       help='要获取的持有者数量 (默认: 100)')
+    parser.add_argument('--backend', choices=['selenium', 'cdp'], default=os.environ.get('GMGN_BACKEND', 'selenium'),
+                      help='浏览器驱动后端 (默认: selenium，可用环境变量GMGN_BACKEND设置)')
+    parser.add_argument('--capture', type=str, default=None,
+                      help='将渲染后的页面保存到指定快照目录')
+    parser.add_argument('--replay', type=str, default=None,
+                      help='不启动浏览器，从指定快照目录重新提取')
+    parser.add_argument('--profile', type=str, nargs='?', const='profile_gmgn_get_url', default=None,
+                      help='记录cProfile和WebDriver命令跟踪，输出到 <前缀>.prof 和 <前缀>.trace.jsonl，汇总打印到stderr')
     
     # 解析命令行参数
     args = parser.parse_args()
@@ -321,11 +367,36 @@ def main():
     # 创建URL
     url = f"{base_url.rstrip('/')}/{args.input.lstrip('/')}"
     
+    profiler = Profiler(args.profile) if args.profile else None
+    if profiler:
+        profiler.start()
+
+    # 回放模式：直接在快照上提取
+    if args.replay:
+        try:
+            snapshot = SnapshotStore(args.replay).open(url)
+            if snapshot is None:
+                logging.error(f"没有 {url} 的快照")
+                return
+            if profiler:
+                snapshot = profiler.wrap(snapshot)
+            print_page_info({'url': url, 'wallet_addresses': get_element_text(snapshot, 'holder_link', args.number)})
+        finally:
+            if profiler:
+                profiler.finish()
+        return
+
+    global CAPTURE_STORE
+    if args.capture:
+        CAPTURE_STORE = SnapshotStore(args.capture)
+
     # 创建一个浏览器实例
     global driver
     driver = None
     try:
-        driver = create_driver()
+        driver = create_driver(args.backend)
+        if profiler:
+            driver = profiler.wrap(driver)
         # 处理URL并获取结果
         result = get_page_info(driver, url, args.number)
         if result:
@@ -336,6 +407,8 @@ def main():
         if driver:
             safe_quit_driver(driver)
             driver = None
+        if profiler:
+            profiler.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,196 @@
+import argparse
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+import gmgn_get_url
+import gmgn_get_info
+
+TOKEN_BASE_URL = "https://gmgn.ai/sol/token"
+ADDRESS_BASE_URL = "https://gmgn.ai/sol/address"
+DEFAULT_INDEX_FILE = 'holder_index.json'
+
+class HolderIndex:
+    """
+    跨代币的持有者索引：钱包 -> 持有的代币，代币 -> 持有者钱包
+    用于在多代币扫描中去重钱包信息抓取，并支持重叠持仓查询
+    """
+    def __init__(self):
+        self.token_wallets = {}   # 代币 -> 按排名排列的钱包列表
+        self.wallet_tokens = {}   # 钱包 -> 持有的代币集合
+        self.wallet_info = {}     # 钱包 -> {'info': 钱包信息, 'fetched_at': 时间戳}
+
+    def add_token(self, token, wallets):
+        """
+        写入一个代币的持有者列表，替换该代币之前的记录
+        """
+        self.remove_token(token)
+        self.token_wallets[token] = list(wallets)
+        for wallet in wallets:
+            self.wallet_tokens.setdefault(wallet, set()).add(token)
+
+    def remove_token(self, token):
+        for wallet in self.token_wallets.pop(token, []):
+            tokens = self.wallet_tokens.get(wallet)
+            if tokens is None:
+                continue
+            tokens.discard(token)
+            if not tokens:
+                del self.wallet_tokens[wallet]
+
+    def tokens_of(self, wallet):
+        return sorted(self.wallet_tokens.get(wallet, ()))
+
+    def wallets_of(self, token):
+        return list(self.token_wallets.get(token, []))
+
+    def wallets_to_fetch(self, max_age=None, now=None):
+        """
+        返回需要抓取信息的钱包，每个钱包只出现一次
+        :param max_age: 已有信息的有效秒数，None表示已有信息的钱包都跳过
+        """
+        now = now or time.time()
+        wallets = []
+        for wallet in self.wallet_tokens:
+            entry = self.wallet_info.get(wallet)
+            if entry is None or (max_age is not None and now - entry['fetched_at'] > max_age):
+                wallets.append(wallet)
+        return wallets
+
+    def set_wallet_info(self, wallet, info):
+        self.wallet_info[wallet] = {'info': info, 'fetched_at': time.time()}
+
+    def infos_of(self, tokens):
+        """
+        返回这些代币的持有者中已有信息的钱包信息，每个钱包只出现一次，按代币和排名排列
+        """
+        infos = []
+        seen = set()
+        for token in tokens:
+            for wallet in self.token_wallets.get(token, []):
+                if wallet in seen or wallet not in self.wallet_info:
+                    continue
+                seen.add(wallet)
+                infos.append(self.wallet_info[wallet]['info'])
+        return infos
+
+    def overlap(self, tokens=None, min_count=2):
+        """
+        查询同时持有多个代币的钱包
+        :param tokens: 限定的代币列表，None表示索引中的全部代币
+        :param min_count: 至少持有的代币数量
+        :return: [(钱包, [代币...])]，按持有数量从多到少排序
+        """
+        if tokens is None:
+            counts = {wallet: len(held) for wallet, held in self.wallet_tokens.items()}
+        else:
+            counts = Counter()
+            for token in set(tokens):
+                counts.update(self.token_wallets.get(token, ()))
+        selected = set(tokens) if tokens is not None else None
+        matches = []
+        for wallet, count in counts.items():
+            if count < min_count:
+                continue
+            held = self.tokens_of(wallet)
+            if selected is not None:
+                held = [token for token in held if token in selected]
+            matches.append((wallet, held))
+        matches.sort(key=lambda item: (-len(item[1]), item[0]))
+        return matches
+
+    def save(self, filename=DEFAULT_INDEX_FILE):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'token_wallets': self.token_wallets, 'wallet_info': self.wallet_info}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, filename=DEFAULT_INDEX_FILE):
+        """
+        从文件加载索引，文件不存在时返回空索引
+        """
+        index = cls()
+        if not os.path.exists(filename):
+            return index
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for token, wallets in data.get('token_wallets', {}).items():
+            index.add_token(token, wallets)
+        index.wallet_info = data.get('wallet_info', {})
+        return index
+
+def sweep(driver, index, tokens, count, fetch_info=False, max_age=None):
+    """
+    扫描多个代币的持有者并写入索引，钱包信息在整个扫描中只抓取一次
+    :return: 扫描到的持有者的钱包信息列表，包括索引中已有、本次跳过抓取的钱包
+    """
+    swept = []
+    for token in tokens:
+        page_info = gmgn_get_url.get_page_info(driver, f"{TOKEN_BASE_URL}/{token}", count)
+        if not page_info:
+            logging.error(f"获取代币 {token} 的持有者失败")
+            continue
+        index.add_token(token, page_info['wallet_addresses'])
+        swept.append(token)
+        gmgn_get_url.random_sleep(1, 2)
+
+    if not fetch_info:
+        return []
+
+    wallets = index.wallets_to_fetch(max_age)
+    logging.info(f"共 {len(index.wallet_tokens)} 个钱包，需要抓取 {len(wallets)} 个")
+    urls = [f"{ADDRESS_BASE_URL}/{wallet}" for wallet in wallets]
+    retry_queue = gmgn_get_info.RetryQueue()
+    results = gmgn_get_info.process_batch(driver, urls, wallets, retry_queue)
+    results.extend(gmgn_get_info.drain_retry_queue(driver, retry_queue))
+    for result in results:
+        index.set_wallet_info(result['address'], result)
+    return index.infos_of(swept)
+
+def main():
+    """
+    跨代币持有者索引
+
+    使用方法：
+    python gmgn_holder_index.py sweep -i TOKEN1 TOKEN2 TOKEN3 -n 100 --info
+    python gmgn_holder_index.py overlap -t TOKEN1 TOKEN2 TOKEN3 -m 3
+    """
+    parser = argparse.ArgumentParser(description='跨代币持有者索引')
+    parser.add_argument('--backend', choices=['selenium', 'cdp'], default=os.environ.get('GMGN_BACKEND', 'selenium'), help='浏览器驱动后端 (默认: selenium，可用环境变量GMGN_BACKEND设置)')
+    parser.add_argument('--index', type=str, default=DEFAULT_INDEX_FILE, help=f'索引文件 (默认: {DEFAULT_INDEX_FILE})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sweep_parser = subparsers.add_parser('sweep', help='扫描代币持有者并更新索引')
+    sweep_parser.add_argument('-i', '--input', type=str, nargs='+', required=True, help='代币地址，以空格分隔')
+    sweep_parser.add_argument('-n', '--number', type=int, default=100, help='每个代币获取的持有者数量 (默认: 100)')
+    sweep_parser.add_argument('--info', action='store_true', help='为去重后的钱包抓取信息并保存到results.csv')
+    sweep_parser.add_argument('--max-age', type=int, default=None, help='已有钱包信息的有效秒数，过期后重新抓取 (默认: 永不过期)')
+
+    overlap_parser = subparsers.add_parser('overlap', help='查询同时持有多个代币的钱包，不重新抓取')
+    overlap_parser.add_argument('-t', '--tokens', type=str, nargs='*', default=None, help='限定的代币地址 (默认: 索引中的全部代币)')
+    overlap_parser.add_argument('-m', '--min', type=int, default=2, help='至少持有的代币数量 (默认: 2)')
+
+    args = parser.parse_args()
+    index = HolderIndex.load(args.index)
+
+    if args.command == 'overlap':
+        for wallet, held in index.overlap(args.tokens, args.min):
+            print(f"{wallet},{len(held)},{' '.join(held)}")
+        return
+
+    driver = None
+    try:
+        driver = gmgn_get_url.create_driver(args.backend)
+        results = sweep(driver, index, [token.strip('/') for token in args.input], args.number, args.info, args.max_age)
+        if results and not gmgn_get_info.save_to_csv(results):
+            logging.error("保存结果失败")
+    except Exception as e:
+        logging.error(f"程序执行出错: {str(e)}")
+    finally:
+        # 中途出错时也保留已扫描的部分
+        index.save(args.index)
+        gmgn_get_url.safe_quit_driver(driver)
+
+if __name__ == "__main__":
+    main()
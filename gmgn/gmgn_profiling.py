@@ -0,0 +1,240 @@
+import argparse
+import cProfile
+import glob
+import json
+import os
+import pstats
+import sys
+import time
+from collections import defaultdict
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 这些文件中的函数不作为命令的归属函数，继续向上查找调用者
+SKIP_FILES = {'gmgn_profiling.py', 'gmgn_selectors.py'}
+
+def caller_name():
+    """
+    找到发起WebDriver命令的抓取函数，例如 get_element_text、scroll_to_position
+    """
+    frame = sys._getframe(2)
+    while frame:
+        code = frame.f_code
+        if (code.co_filename.startswith(REPO_DIR) and os.path.basename(code.co_filename) not in SKIP_FILES
+                and not code.co_name.startswith('<')):
+            return code.co_name
+        frame = frame.f_back
+    return '<unknown>'
+
+def payload_size(value):
+    """
+    估算命令返回的数据量（字节）
+    """
+    try:
+        return len(json.dumps(value, default=lambda o: '<element>', ensure_ascii=False).encode('utf-8'))
+    except Exception:
+        return 0
+
+class TracingElement:
+    """
+    记录元素上每次命令的WebElement代理
+    """
+    def __init__(self, element, profiler):
+        self._element = element
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._element, name)
+
+    def get_attribute(self, name):
+        return self._profiler.call('get_attribute', name, self._element.get_attribute, name)
+
+    def click(self):
+        return self._profiler.call('click', '', self._element.click)
+
+    @property
+    def text(self):
+        return self._profiler.call('text', '', lambda: self._element.text)
+
+    @property
+    def location(self):
+        return self._profiler.call('location', '', lambda: self._element.location)
+
+    def find_elements(self, by, value):
+        elements = self._profiler.call('find_elements', f'{by}={value}', self._element.find_elements, by, value)
+        return [TracingElement(element, self._profiler) for element in elements]
+
+    def find_element(self, by, value):
+        element = self._profiler.call('find_element', f'{by}={value}', self._element.find_element, by, value)
+        return TracingElement(element, self._profiler)
+
+class TracingDriver:
+    """
+    记录每条WebDriver命令（名称、选择器、耗时、返回数据量、调用函数）的driver代理
+    """
+    def __init__(self, driver, profiler):
+        self._driver = driver
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        attribute = getattr(self._driver, name)
+        if name == 'execute_scripts':
+            # CDP驱动的批量脚本只产生一次往返，记为一条命令
+            return lambda scripts: self._profiler.call('execute_scripts', f'{len(scripts)} scripts', attribute, scripts)
+        return attribute
+
+    def get(self, url):
+        return self._profiler.call('get', url, self._driver.get, url)
+
+    def find_elements(self, by, value):
+        elements = self._profiler.call('find_elements', f'{by}={value}', self._driver.find_elements, by, value)
+        return [TracingElement(element, self._profiler) for element in elements]
+
+    def find_element(self, by, value):
+        element = self._profiler.call('find_element', f'{by}={value}', self._driver.find_element, by, value)
+        return TracingElement(element, self._profiler)
+
+    def execute_script(self, script, *args):
+        args = [arg._element if isinstance(arg, TracingElement) else arg for arg in args]
+        # 脚本压缩空白后取前80个字符作为选择器
+        summary = ' '.join(script.split())[:80]
+        return self._profiler.call('execute_script', summary, self._driver.execute_script, script, *args)
+
+    @property
+    def title(self):
+        return self._profiler.call('title', '', lambda: self._driver.title)
+
+    @property
+    def page_source(self):
+        return self._profiler.call('page_source', '', lambda: self._driver.page_source)
+
+    @property
+    def current_url(self):
+        return self._profiler.call('current_url', '', lambda: self._driver.current_url)
+
+class Profiler:
+    """
+    --profile 的实现：cProfile + WebDriver命令跟踪
+    输出 <prefix>.prof（可用 snakeviz / flameprof 生成火焰图）和 <prefix>.trace.jsonl
+    """
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.records = []
+        self.profile = cProfile.Profile()
+        self.thread_profiles = []
+
+    def start(self):
+        self.profile.enable()
+
+    def wrap(self, driver):
+        return TracingDriver(driver, self) if driver is not None else None
+
+    def run_thread(self, func, *args):
+        """
+        在工作线程中运行func（例如 --tabs 的每个标签页）
+        cProfile只采样调用enable的线程，每个工作线程单独采样，finish时合并
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12起cProfile基于sys.monitoring，主线程的采样已覆盖所有线程
+            return func(*args)
+        self.thread_profiles.append(profile)
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+
+    def call(self, command, selector, func, *args):
+        result = None
+        started = time.perf_counter()
+        try:
+            result = func(*args)
+            return result
+        finally:
+            self.records.append({
+                'command': command,
+                'selector': selector,
+                'duration': time.perf_counter() - started,
+                'size': payload_size(result),
+                'caller': caller_name(),
+            })
+
+    def finish(self, stream=sys.stderr):
+        """
+        停止采样，写出文件并打印汇总（写到stderr，stdout留给结果数据）
+        """
+        self.profile.disable()
+        directory = os.path.dirname(self.prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stats = pstats.Stats(self.profile)
+        for profile in self.thread_profiles:
+            stats.add(profile)
+        stats.dump_stats(f'{self.prefix}.prof')
+        with open(f'{self.prefix}.trace.jsonl', 'w', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print_summary(self.records, function_times(stats), stream)
+        print(f"性能数据已保存: {self.prefix}.prof, {self.prefix}.trace.jsonl", file=stream)
+
+def function_times(stats):
+    """
+    从cProfile结果中取出本仓库函数的累计耗时
+    :return: {函数名: 秒}
+    """
+    times = defaultdict(float)
+    for (filename, _, name), (_, _, _, cumulative, _) in stats.stats.items():
+        if filename.startswith(REPO_DIR):
+            times[name] += cumulative
+    return times
+
+def print_summary(records, function_cumulative=None, stream=sys.stderr):
+    """
+    按调用函数和命令类型汇总WebDriver往返
+    """
+    by_caller = defaultdict(lambda: [0, 0.0, 0])
+    by_command = defaultdict(lambda: [0, 0.0, 0])
+    for record in records:
+        for key, table in ((record['caller'], by_caller), (record['command'], by_command)):
+            table[key][0] += 1
+            table[key][1] += record['duration']
+            table[key][2] += record['size']
+
+    function_cumulative = function_cumulative or {}
+    print(f"\nWebDriver命令共 {len(records)} 次，耗时 {sum(r['duration'] for r in records):.3f}s", file=stream)
+    print(f"{'函数':<32}{'往返次数':>10}{'命令耗时(s)':>14}{'函数总耗时(s)':>16}{'数据量(B)':>12}", file=stream)
+    for name, (count, duration, size) in sorted(by_caller.items(), key=lambda item: -item[1][1]):
+        cumulative = function_cumulative.get(name)
+        cumulative = f'{cumulative:.3f}' if cumulative is not None else '-'
+        print(f"{name:<32}{count:>10}{duration:>14.3f}{cumulative:>16}{size:>12}", file=stream)
+    print(f"{'命令':<32}{'次数':>10}{'耗时(s)':>14}", file=stream)
+    for name, (count, duration, _) in sorted(by_command.items(), key=lambda item: -item[1][1]):
+        print(f"{name:<32}{count:>10}{duration:>14.3f}", file=stream)
+
+def main():
+    """
+    汇总多个 --profile 输出（例如server为每个子进程生成的文件）
+
+    使用方法：
+    python gmgn_profiling.py profile/*.trace.jsonl
+    """
+    parser = argparse.ArgumentParser(description='汇总WebDriver命令跟踪')
+    parser.add_argument('files', nargs='+', help='.trace.jsonl 文件')
+    args = parser.parse_args()
+
+    records = []
+    function_cumulative = defaultdict(float)
+    for pattern in args.files:
+        for filename in glob.glob(pattern) or [pattern]:
+            with open(filename, 'r', encoding='utf-8') as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+            prof = filename[:-len('.trace.jsonl')] + '.prof'
+            if os.path.exists(prof):
+                for name, seconds in function_times(pstats.Stats(prof)).items():
+                    function_cumulative[name] += seconds
+    print_summary(records, function_cumulative, sys.stdout)
+
+if __name__ == '__main__':
+    main()
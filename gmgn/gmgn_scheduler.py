@@ -0,0 +1,125 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+# 优先级从高到低：界面上的单个查询、批量流式查询、后台刷新
+INTERACTIVE = 'interactive'
+PIPELINE = 'pipeline'
+BACKGROUND = 'background'
+PRIORITIES = (INTERACTIVE, PIPELINE, BACKGROUND)
+
+class WorkScheduler:
+    """
+    server共享的抓取槽位调度器
+    - 有空闲槽位时总是先分给优先级高的类别
+    - 同一类别内按任务轮流分配，一个1000个地址的任务不会让其他任务一直等待
+    - 每个类别可设并发上限；reserved 个槽位只留给 interactive，批量任务占满时单个查询也能立即开始
+    - background 默认比 interactive 以外可用的槽位少一个
+    """
+    def __init__(self, capacity, quotas=None, reserved=1):
+        self.capacity = max(1, capacity)
+        self.reserved = min(max(0, reserved), self.capacity - 1)
+        self.quotas = {priority: self.capacity for priority in PRIORITIES}
+        # 默认给pipeline留一个槽位，后台刷新占满时批量任务也能开始
+        self.quotas[BACKGROUND] = max(1, self.capacity - self.reserved - 1)
+        self.quotas.update(quotas or {})
+        self.running = {priority: 0 for priority in PRIORITIES}
+        # 类别 -> OrderedDict(任务 -> 等待中的future队列)，OrderedDict的顺序即轮转顺序
+        self.waiting = {priority: OrderedDict() for priority in PRIORITIES}
+
+    def _can_start(self, priority):
+        total = sum(self.running.values())
+        if total >= self.capacity or self.running[priority] >= self.quotas[priority]:
+            return False
+        if priority != INTERACTIVE:
+            return total - self.running[INTERACTIVE] < self.capacity - self.reserved
+        return True
+
+    def _next_waiter(self, priority):
+        """
+        轮到的任务取出一个等待者，并把该任务移到队尾
+        """
+        jobs = self.waiting[priority]
+        while jobs:
+            job, waiters = next(iter(jobs.items()))
+            while waiters and waiters[0].done():
+                waiters.popleft()  # 已取消的等待者
+            if not waiters:
+                del jobs[job]
+                continue
+            future = waiters.popleft()
+            if waiters:
+                jobs.move_to_end(job)
+            else:
+                del jobs[job]
+            return future
+        return None
+
+    def _dispatch(self):
+        while True:
+            for priority in PRIORITIES:
+                if not self._can_start(priority):
+                    continue
+                future = self._next_waiter(priority)
+                if future is not None:
+                    self.running[priority] += 1
+                    future.set_result(None)
+                    break
+            else:
+                return
+
+    async def acquire(self, priority=PIPELINE, job=None):
+        """
+        等待一个槽位
+        :param job: 同一任务的请求共用一个key参与轮转，None表示单独成为一个任务
+        """
+        if priority not in self.running:
+            raise ValueError(f'未知的优先级: {priority}')
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[priority].setdefault(job if job is not None else object(), deque()).append(future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 刚分到槽位就被取消时要归还
+            if future.done() and not future.cancelled():
+                self.release(priority)
+            raise
+
+    def release(self, priority):
+        self.running[priority] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority=PIPELINE, job=None):
+        await self.acquire(priority, job)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self):
+        """
+        :return: {类别: {'running': 运行数, 'waiting': 等待数, 'jobs': 等待中的任务数}}
+        """
+        result = {}
+        for priority in PRIORITIES:
+            queues = [[f for f in waiters if not f.done()] for waiters in self.waiting[priority].values()]
+            result[priority] = {
+                'running': self.running[priority],
+                'waiting': sum(len(waiters) for waiters in queues),
+                'jobs': sum(1 for waiters in queues if waiters),
+            }
+        return result
+
+def parse_quotas(values):
+    """
+    解析命令行中的 类别=数量 列表
+    """
+    quotas = {}
+    for value in values or []:
+        priority, _, count = value.partition('=')
+        if priority not in PRIORITIES or not count.isdigit():
+            raise ValueError(f'无效的配额: {value}，格式为 {"|".join(PRIORITIES)}=数量')
+        quotas[priority] = int(count)
+    return quotas
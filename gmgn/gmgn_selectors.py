@@ -0,0 +1,168 @@
+from selenium.webdriver.common.by import By
+import json
+import logging
+import os
+
+# gmgn 页面使用带哈希的class名，每次发版都可能变化
+# 每个字段按优先级列出多个定位方式：哈希class -> 文字锚定的XPath -> aria/label
+INFO_SELECTORS = {
+    # 地址页加载完成的标志元素
+    'anchor': [
+        (By.CLASS_NAME, 'css-6hgaua'),
+        (By.XPATH, "//*[normalize-space(text())='胜率' or normalize-space(text())='Win Rate']"),
+    ],
+    'recent_7d_profit_percentage': [
+        (By.CLASS_NAME, 'css-18pbzhy'),
+        (By.XPATH, "//*[contains(normalize-space(text()), '7D') and (contains(text(), '盈亏') or contains(text(), 'PnL'))]/following-sibling::*[1]/*[1]"),
+    ],
+    'recent_7d_profit_amount': [
+        (By.CLASS_NAME, 'css-vi0yzx'),
+        (By.XPATH, "//*[contains(normalize-space(text()), '7D') and (contains(text(), '盈亏') or contains(text(), 'PnL'))]/following-sibling::*[1]/*[2]"),
+    ],
+    'win_rate': [
+        (By.CLASS_NAME, 'css-3h278t'),
+        (By.XPATH, "//*[normalize-space(text())='胜率' or normalize-space(text())='Win Rate']/following-sibling::*[1]"),
+    ],
+    'total_trades_current': [
+        (By.CLASS_NAME, 'css-131utnt'),
+        (By.XPATH, "//*[contains(text(), '交易数') or contains(text(), 'TXs')]/following-sibling::*[1]/*[1]"),
+    ],
+    'total_trades_target': [
+        (By.CLASS_NAME, 'css-159dfc2'),
+        (By.XPATH, "//*[contains(text(), '交易数') or contains(text(), 'TXs')]/following-sibling::*[1]/*[2]"),
+    ],
+    'total_profit_loss': [
+        (By.CLASS_NAME, 'css-1pjn4fe'),
+        (By.XPATH, "//*[contains(text(), '总盈亏') or contains(text(), 'Total PnL')]/following-sibling::*[1]"),
+    ],
+    'unrealized_profit': [
+        (By.CLASS_NAME, 'css-1ki3vv4'),
+        (By.XPATH, "//*[contains(text(), '未实现') or contains(text(), 'Unrealized')]/following-sibling::*[1]"),
+    ],
+    'buy_cost': [
+        (By.CLASS_NAME, 'css-13k40wa'),
+        (By.XPATH, "//*[contains(text(), '买入成本') or contains(text(), 'Buy Cost')]/following-sibling::*[1]"),
+    ],
+    'token_balance': [
+        (By.CLASS_NAME, 'css-qq3v8v'),
+        (By.XPATH, "//*[@aria-label='SOL Balance' or contains(text(), 'SOL余额') or contains(text(), 'SOL Bal')]/following-sibling::*[1]"),
+    ],
+}
+
+URL_SELECTORS = {
+    # 持有者列表加载完成的标志元素
+    'holder_row': [
+        (By.CLASS_NAME, 'css-f8qc29'),
+        (By.XPATH, "//div[@role='tabpanel']//a[contains(@href, '/sol/address/')]"),
+    ],
+    # 持有者钱包链接
+    'holder_link': [
+        (By.CLASS_NAME, 'css-4949n9'),
+        (By.CSS_SELECTOR, "div[role='tabpanel'] a[href*='/sol/address/']"),
+    ],
+    'holders_tab': [
+        (By.XPATH, "//button[contains(@class, 'chakra-tabs__tab') and .//div[contains(text(), '持有者')]]"),
+        (By.XPATH, "//*[@role='tab' and (contains(., '持有者') or contains(., 'Holders'))]"),
+    ],
+    'modal': [
+        (By.CLASS_NAME, 'chakra-modal__content-container'),
+        (By.CSS_SELECTOR, "[role='dialog']"),
+    ],
+}
+
+# 可选的覆盖文件，gmgn改版时无需修改代码即可更新定位方式
+OVERRIDES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'selectors.json')
+
+class SelectorRegistry:
+    """
+    字段定位方式注册表
+    记录每个字段当前可用的定位方式，失效时自动尝试备用方式，
+    探测后仍找不到的字段直接跳过，不再等待
+    """
+    def __init__(self, selectors, overrides_file=OVERRIDES_FILE):
+        self.selectors = {field: list(locators) for field, locators in selectors.items()}
+        self.resolved = {}
+        self.broken = set()
+        self.probed = False
+        if overrides_file and os.path.exists(overrides_file):
+            self.load_overrides(overrides_file)
+
+    def load_overrides(self, filename):
+        """
+        从JSON文件加载覆盖的定位方式，格式: {"字段": [["class name", "css-xxx"], ...]}
+        覆盖项排在内置定位方式之前
+        """
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                overrides = json.load(f)
+        except Exception as e:
+            logging.warning(f"读取定位覆盖文件 {filename} 失败: {str(e)}")
+            return
+        for field, locators in overrides.items():
+            if field in self.selectors:
+                self.selectors[field] = [tuple(locator) for locator in locators] + self.selectors[field]
+
+    def locators(self, field):
+        """
+        返回字段的候选定位方式，已确认可用的排在最前
+        """
+        candidates = self.selectors[field]
+        resolved = self.resolved.get(field)
+        if resolved:
+            return [resolved] + [locator for locator in candidates if locator != resolved]
+        return candidates
+
+    def locator(self, field):
+        """
+        返回字段当前首选的定位方式，用于WebDriverWait
+        """
+        return self.locators(field)[0]
+
+    def is_broken(self, field):
+        return field in self.broken
+
+    def find_elements(self, driver, field):
+        """
+        按优先级查找字段元素，首选方式失效时自动切换到备用方式
+        :return: 元素列表，字段已失效时直接返回空列表
+        """
+        if field in self.broken:
+            return []
+        for by, value in self.locators(field):
+            try:
+                elements = driver.find_elements(by, value)
+            except Exception:
+                continue
+            if elements:
+                if self.resolved.get(field) != (by, value):
+                    if field in self.resolved:
+                        logging.warning(f"字段 {field} 的定位方式已切换为 {by}: {value}")
+                    self.resolved[field] = (by, value)
+                return elements
+        return []
+
+    def probe(self, driver, fields=None):
+        """
+        在一个已加载的页面上验证所有字段，找不到的字段标记为失效
+        :return: {字段: 可用的定位方式或None}
+        """
+        report = {}
+        for field in fields or self.selectors:
+            self.broken.discard(field)
+            self.resolved.pop(field, None)
+            if self.find_elements(driver, field):
+                report[field] = self.resolved[field]
+                if self.resolved[field] != self.selectors[field][0]:
+                    logging.warning(f"字段 {field} 首选定位方式失效，使用备用方式 {self.resolved[field]}")
+            else:
+                report[field] = None
+                self.broken.add(field)
+                logging.warning(f"字段 {field} 所有定位方式均失效，本次运行将跳过该字段")
+        self.probed = True
+        return report
+
+    def anchor_candidates(self, field):
+        """
+        返回可传给页面探测脚本的 [by, value] 列表
+        """
+        return [[by, value] for by, value in self.locators(field)]
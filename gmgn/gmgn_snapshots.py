@@ -0,0 +1,214 @@
+from selenium.common.exceptions import WebDriverException, NoSuchElementException
+from urllib.parse import urljoin
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+class SnapshotStore:
+    """
+    按内容寻址的页面快照库
+    objects/<哈希前两位>/<sha256>.html.gz 保存渲染后的DOM，相同内容只存一份；
+    index.jsonl 每行记录一次抓取 {url, hash, captured_at}，多进程同时追加也安全
+    """
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_file = os.path.join(root, 'index.jsonl')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_size = 0
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f'{digest}.html.gz')
+
+    def put(self, url, html):
+        """
+        保存一个页面快照
+        :return: 内容哈希
+        """
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再改名，避免并发写入产生半个文件
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(temp_path, path)
+        line = (json.dumps({'url': url, 'hash': digest, 'captured_at': time.time()}) + '\n').encode('utf-8')
+        # 二进制模式读写，Windows下不会把换行转换成\r\n，读取时的偏移量才准确
+        with self._lock, open(self.index_file, 'ab') as f:
+            f.write(line)
+        return digest
+
+    def _load_index(self):
+        """
+        读取索引，只解析上次读取之后追加的部分
+        """
+        if self._index is None:
+            self._index = {}
+            self._index_size = 0
+        if not os.path.exists(self.index_file):
+            return self._index
+        with open(self.index_file, 'rb') as f:
+            f.seek(self._index_size)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self._index_size += len(line)
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._index.setdefault(entry['url'], []).append(entry)
+        return self._index
+
+    def history(self, url):
+        """
+        返回某个URL的全部快照记录，按时间先后排列
+        """
+        with self._lock:
+            return list(self._load_index().get(url, []))
+
+    def urls(self):
+        with self._lock:
+            return list(self._load_index())
+
+    def read(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return gzip.decompress(f.read()).decode('utf-8')
+
+    def get(self, url):
+        """
+        返回某个URL最近一次的快照内容，没有时返回None
+        """
+        entries = self.history(url)
+        if not entries:
+            return None
+        return self.read(entries[-1]['hash'])
+
+    def open(self, url):
+        """
+        返回加载了该URL最近快照的SnapshotDriver，可直接作为测试夹具传给提取函数
+        """
+        html = self.get(url)
+        return SnapshotDriver(html, url) if html is not None else None
+
+class SnapshotElement:
+    """
+    静态DOM中的元素，提供抓取函数用到的WebElement接口
+    """
+    def __init__(self, driver, node):
+        self.driver = driver
+        self.node = node
+
+    def get_attribute(self, name):
+        if name in ('innerText', 'textContent'):
+            return self.node.text_content()
+        value = self.node.get('class' if name == 'className' else name)
+        if value is not None and name in ('href', 'src'):
+            return urljoin(self.driver.current_url, value)
+        return value
+
+    @property
+    def text(self):
+        return self.node.text_content().strip()
+
+    @property
+    def location(self):
+        return {'x': 0, 'y': 0}
+
+    def direct_text(self):
+        """
+        只取元素自身的文本节点，对应抓取脚本中的childNodes过滤
+        """
+        parts = [self.node.text] + [child.tail for child in self.node]
+        return ' '.join(part.strip() for part in parts if part is not None)
+
+    def click(self):
+        pass
+
+    def find_elements(self, by, value):
+        return self.driver._find_elements(by, value, self.node)
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f'找不到元素: {by}={value}')
+        return elements[0]
+
+class SnapshotDriver:
+    """
+    在保存的DOM上回放提取逻辑，不需要浏览器和网络
+    execute_script 只能识别抓取脚本中用到的几段固定脚本
+    """
+    def __init__(self, html, url):
+        try:
+            import lxml.html
+        except ImportError:
+            raise WebDriverException('快照回放需要安装 lxml: pip install lxml')
+        self.current_url = url
+        self.page_source = html
+        self.tree = lxml.html.fromstring(html)
+
+    @property
+    def title(self):
+        return (self.tree.findtext('.//title') or '').strip()
+
+    def get(self, url):
+        if url != self.current_url:
+            raise WebDriverException(f'没有 {url} 的快照')
+
+    def _exists(self, by, value):
+        try:
+            return bool(self._find_elements(by, value))
+        except Exception:
+            return False
+
+    def _find_elements(self, by, value, root=None):
+        root = self.tree if root is None else root
+        if by == 'class name':
+            nodes = root.xpath(f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')]")
+        elif by == 'xpath':
+            nodes = root.xpath(value)
+        elif by == 'css selector':
+            nodes = root.cssselect(value)
+        elif by == 'tag name':
+            nodes = root.iter(value)
+        elif by == 'id':
+            nodes = root.xpath(f".//*[@id='{value}']")
+        else:
+            raise WebDriverException(f'不支持的定位方式: {by}')
+        return [SnapshotElement(self, node) for node in nodes if hasattr(node, 'tag')]
+
+    def find_elements(self, by, value):
+        return self._find_elements(by, value)
+
+    def find_element(self, by, value):
+        elements = self._find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f'找不到元素: {by}={value}')
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        # 页面状态探测（gmgn_get_info.PAGE_PROBE_SCRIPT）
+        if 'hasAnchor' in script:
+            body = self.tree.find('.//body')
+            return {
+                'readyState': 'complete',
+                'title': self.title,
+                'text': body.text_content()[:2000] if body is not None else '',
+                'hasAnchor': any(self._exists(by, value) for by, value in args[0]),
+            }
+        # 元素直接文本（gmgn_get_info.DIRECT_TEXT_SCRIPT）
+        if 'childNodes' in script and args and isinstance(args[0], SnapshotElement):
+            return args[0].direct_text()
+        if 'document.readyState' in script:
+            return 'complete'
+        # 滚动、点击等操作在静态DOM上没有效果
+        return None
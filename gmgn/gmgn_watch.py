@@ -0,0 +1,202 @@
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import time
+
+import gmgn_get_url
+import gmgn_get_info
+from gmgn_get_info import PageLoadError
+
+TOKEN_BASE_URL = "https://gmgn.ai/sol/token"
+ADDRESS_BASE_URL = "https://gmgn.ai/sol/address"
+
+def summarize_page_info(page_info):
+    """
+    将钱包信息压缩为与server返回一致的字段
+    """
+    return {
+        'address': page_info['address'],
+        'winRate': page_info['win_rate'],
+        'transactions': f"{page_info['total_trades']['current']}/{page_info['total_trades']['target']}",
+        'profit': f"{page_info['recent_7d_profit']['percentage']} ({page_info['recent_7d_profit']['amount']})",
+        'balance': page_info['token_balance'],
+    }
+
+def emit(event, **data):
+    """
+    以JSON行输出一个事件，供server转成SSE
+    """
+    print(json.dumps({'event': event, **data}, ensure_ascii=False), flush=True)
+
+def diff_holders(previous, current):
+    """
+    比较两次持有者快照
+    :param previous: {地址: 排名}
+    :param current: {地址: 排名}
+    :return: (新增地址列表, 移除地址列表, 排名变化列表[(地址, 旧排名, 新排名)])
+    """
+    added = [address for address in current if address not in previous]
+    removed = [address for address in previous if address not in current]
+    moved = [(address, previous[address], rank) for address, rank in current.items()
+             if address in previous and previous[address] != rank]
+    return added, removed, moved
+
+class HolderWatcher:
+    """
+    定时轮询代币持有者列表，只为新出现或超过时效的持有者抓取钱包信息
+    """
+    def __init__(self, driver, token, count, stale_after, state_file=None):
+        self.driver = driver
+        self.token = token
+        self.count = count
+        self.stale_after = stale_after
+        self.state_file = state_file
+        self.holders = {}   # 地址 -> 排名
+        self.wallets = {}   # 地址 -> {'info': 摘要, 'fetched_at': 时间戳}
+        self.load_state()
+
+    def load_state(self):
+        """
+        读取上次运行保存的快照，重启后无需重新抓取全部持有者
+        """
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('token') == self.token:
+                self.holders = state.get('holders', {})
+                self.wallets = state.get('wallets', {})
+        except Exception as e:
+            logging.warning(f"读取快照文件 {self.state_file} 失败: {str(e)}")
+
+    def save_state(self):
+        if not self.state_file:
+            return
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({'token': self.token, 'holders': self.holders, 'wallets': self.wallets}, f, ensure_ascii=False)
+        except Exception as e:
+            logging.warning(f"保存快照文件 {self.state_file} 失败: {str(e)}")
+
+    def is_stale(self, address, now):
+        entry = self.wallets.get(address)
+        return entry is None or now - entry['fetched_at'] > self.stale_after
+
+    def fetch_wallet(self, address):
+        """
+        抓取单个钱包信息，失败时返回None
+        """
+        url = f"{ADDRESS_BASE_URL}/{address}"
+        try:
+            return summarize_page_info(gmgn_get_info.fetch_page_info(self.driver, url, address))
+        except PageLoadError as e:
+            emit('error', token=self.token, address=address, kind=e.kind, error=str(e))
+        except Exception as e:
+            emit('error', token=self.token, address=address, kind='unknown', error=str(e))
+        return None
+
+    def poll(self):
+        """
+        执行一轮轮询并输出 added/removed/changed 事件
+        """
+        url = f"{TOKEN_BASE_URL}/{self.token}"
+        page_info = gmgn_get_url.get_page_info(self.driver, url, self.count)
+        if not page_info:
+            emit('error', token=self.token, kind='holders', error='获取持有者列表失败')
+            return
+
+        current = {address: rank for rank, address in enumerate(page_info['wallet_addresses'], 1)}
+        added, removed, moved = diff_holders(self.holders, current)
+
+        for address in removed:
+            emit('removed', token=self.token, address=address, rank=self.holders[address])
+            self.wallets.pop(address, None)
+        self.holders = current
+
+        for address, old_rank, new_rank in moved:
+            emit('changed', token=self.token, address=address, rank=new_rank, previous_rank=old_rank)
+
+        # 只抓取新增或过期的钱包
+        now = time.time()
+        added_set = set(added)
+        for address in current:
+            if address not in added_set and not self.is_stale(address, now):
+                continue
+            info = self.fetch_wallet(address)
+            if info is None:
+                if address in added_set:
+                    emit('added', token=self.token, address=address, rank=current[address], info=None)
+                continue
+            previous = self.wallets.get(address)
+            self.wallets[address] = {'info': info, 'fetched_at': time.time()}
+            if address in added_set:
+                emit('added', token=self.token, address=address, rank=current[address], info=info)
+            elif previous is None:
+                # 新增时抓取失败过，这次才拿到信息
+                emit('changed', token=self.token, address=address, rank=current[address],
+                     info=info, previous_info=None)
+            elif previous['info'] != info:
+                emit('changed', token=self.token, address=address, rank=current[address],
+                     info=info, previous_info=previous['info'])
+
+        self.save_state()
+        emit('snapshot', token=self.token, holders=len(current), added=len(added), removed=len(removed))
+
+    def run(self, interval, rounds=0):
+        """
+        按固定间隔轮询
+        :param rounds: 轮询次数，0表示一直运行
+        """
+        completed = 0
+        while not rounds or completed < rounds:
+            started = time.time()
+            self.poll()
+            completed += 1
+            if rounds and completed >= rounds:
+                break
+            time.sleep(max(0, interval - (time.time() - started)))
+
+def main():
+    """
+    监控代币持有者变化
+
+    使用方法：
+    python gmgn_watch.py -i HxRELUuuoQGD6UUqUxe6qGcsX8wuDKQz9HGqsqEAy7n1 -n 50 --interval 300
+    """
+    parser = argparse.ArgumentParser(description='定时监控代币持有者变化')
+    parser.add_argument('-i', '--input', type=str, required=True, help='代币地址')
+    parser.add_argument('-n', '--number', type=int, default=100, help='要监控的持有者数量 (默认: 100)')
+    parser.add_argument('--interval', type=int, default=300, help='轮询间隔秒数 (默认: 300)')
+    parser.add_argument('--stale', type=int, default=1800, help='钱包信息的有效秒数，过期后重新抓取 (默认: 1800)')
+    parser.add_argument('--rounds', type=int, default=0, help='轮询次数，0表示一直运行 (默认: 0)')
+    parser.add_argument('--backend', choices=['selenium', 'cdp'], default=os.environ.get('GMGN_BACKEND', 'selenium'), help='浏览器驱动后端 (默认: selenium，可用环境变量GMGN_BACKEND设置)')
+    parser.add_argument('--state', type=str, default=None, help='快照文件路径，用于重启后继续比较')
+    args = parser.parse_args()
+
+    driver = None
+
+    def stop(signum, frame):
+        logging.info("接收到终止信号，正在关闭程序...")
+        gmgn_get_url.safe_quit_driver(driver)
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    if hasattr(signal, 'SIGBREAK'):
+        signal.signal(signal.SIGBREAK, stop)
+
+    try:
+        driver = gmgn_get_url.create_driver(args.backend)
+        watcher = HolderWatcher(driver, args.input.strip('/'), args.number, args.stale, args.state)
+        watcher.run(args.interval, args.rounds)
+    except Exception as e:
+        logging.error(f"程序执行出错: {str(e)}")
+    finally:
+        gmgn_get_url.safe_quit_driver(driver)
+
+if __name__ == "__main__":
+    main()
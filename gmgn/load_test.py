@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+import zlib
+from urllib.parse import quote, urlsplit
+
+import uvicorn
+
+import server
+from gmgn_scheduler import WorkScheduler, PIPELINE
+
+async def fake_run_script(*args, priority=PIPELINE, job=None):
+    """
+    模拟抓取脚本：不启动浏览器，只模拟页面加载耗时
+    """
+    async with server.SCHEDULER.slot(priority, job):
+        await asyncio.sleep(random.uniform(0.05, 0.3))
+    address = args[args.index('-i') + 1]
+    return 0, f"{address},55%,10/20,12% ($100),1.5 SOL\n", ''
+
+def start_local_server(workers):
+    """
+    在后台线程启动使用模拟抓取的server
+    :return: 服务地址
+    """
+    server.run_script = fake_run_script
+    server.SCHEDULER = WorkScheduler(workers)
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    config = uvicorn.Config(server.app, host='127.0.0.1', port=port, log_level='warning',
+                            backlog=4096, limit_concurrency=None)
+    instance = uvicorn.Server(config)
+    thread = threading.Thread(target=instance.run, daemon=True)
+    thread.start()
+    while not instance.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+def parse_event(block):
+    """
+    解析一个SSE事件块
+    """
+    event = {'event': 'message', 'data': ''}
+    for line in block.decode('utf-8', 'replace').split('\n'):
+        if line.startswith(':') or ':' not in line:
+            continue
+        field, _, value = line.partition(':')
+        event[field] = value[1:] if value.startswith(' ') else value
+    return event
+
+def result_addresses(event):
+    """
+    取出事件中包含的结果地址，batch事件可能包含多个结果
+    """
+    if event['event'] == 'result':
+        return [json.loads(event['data'])['address']]
+    if event['event'] == 'batch':
+        return [item['data']['address'] for item in json.loads(event['data']) if item['event'] == 'result']
+    return []
+
+async def read_events(base_url, path, compress, last_event_id=None, stop_after=None):
+    """
+    打开一个SSE连接并读取事件
+    :param stop_after: 收到多少个结果后主动断开，用于模拟断线
+    :return: (结果地址列表, 最后一个事件id, 是否收到complete)
+    """
+    parts = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    headers = f"GET {path} HTTP/1.0\r\nHost: {parts.netloc}\r\nAccept: text/event-stream\r\n"
+    if compress:
+        headers += "Accept-Encoding: gzip\r\n"
+    if last_event_id:
+        headers += f"Last-Event-ID: {last_event_id}\r\n"
+    writer.write((headers + "\r\n").encode())
+    await writer.drain()
+
+    addresses = []
+    last_id = last_event_id
+    try:
+        await reader.readuntil(b'\r\n\r\n')
+        decompressor = zlib.decompressobj(31) if compress else None
+        buffer = b''
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                return addresses, last_id, False
+            buffer += decompressor.decompress(chunk) if decompressor else chunk
+            while b'\n\n' in buffer:
+                block, buffer = buffer.split(b'\n\n', 1)
+                event = parse_event(block)
+                last_id = event.get('id', last_id)
+                if event['event'] == 'complete':
+                    return addresses, last_id, True
+                addresses.extend(result_addresses(event))
+                if stop_after and len(addresses) >= stop_after:
+                    return addresses, last_id, False
+    finally:
+        writer.close()
+
+async def stream_client(base_url, addresses, stats, batch, compress, drop):
+    """
+    单个SSE客户端：读取全部事件并校验结果没有丢失或重复
+    :param drop: 收到一半结果后断开，再凭Last-Event-ID重连
+    """
+    started = time.time()
+    path = f"/get-info-stream?addresses={quote(' '.join(addresses))}&batch={batch}"
+    if compress:
+        path += "&compress=1"
+
+    stats['open'] += 1
+    stats['peak_open'] = max(stats['peak_open'], stats['open'])
+    try:
+        received, last_id, completed = await read_events(base_url, path, compress,
+                                                         stop_after=len(addresses) // 2 if drop else None)
+        if drop and not completed:
+            stats['reconnects'] += 1
+            rest, last_id, completed = await read_events(base_url, path, compress, last_event_id=last_id)
+            received += rest
+    finally:
+        stats['open'] -= 1
+
+    if completed and len(received) == len(set(received)) == len(addresses):
+        stats['ok'] += 1
+    else:
+        stats['failed'] += 1
+    stats['latencies'].append(time.time() - started)
+
+async def get_info_request(base_url, address):
+    """
+    发送一次单地址 /get-info 请求
+    :return: 是否成功
+    """
+    parts = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    body = json.dumps({'address': address}).encode()
+    writer.write((f"POST /get-info HTTP/1.0\r\nHost: {parts.netloc}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode() + body)
+    await writer.drain()
+    try:
+        response = await reader.read()
+    finally:
+        writer.close()
+    return response.startswith(b'HTTP/1.1 200') or response.startswith(b'HTTP/1.0 200')
+
+async def interactive_client(base_url, stats, done):
+    """
+    压测期间不断发送单地址查询，记录交互查询的延迟
+    """
+    i = 0
+    while not done.is_set():
+        started = time.time()
+        if not await get_info_request(base_url, f"interactive{i}"):
+            stats['interactive_failed'] += 1
+        stats['interactive'].append(time.time() - started)
+        i += 1
+        await asyncio.sleep(0.1)
+
+async def run_load(base_url, clients, per_client, batch=1, compress=False, drop=False, interactive=0):
+    stats = {'ok': 0, 'failed': 0, 'open': 0, 'peak_open': 0, 'reconnects': 0, 'latencies': [],
+             'interactive': [], 'interactive_failed': 0}
+    jobs = []
+    for i in range(clients):
+        addresses = [f"wallet{i}x{j}" for j in range(per_client)]
+        jobs.append(stream_client(base_url, addresses, stats, batch, compress, drop))
+    done = asyncio.Event()
+    probes = [asyncio.create_task(interactive_client(base_url, stats, done)) for _ in range(interactive)]
+    started = time.time()
+    outcomes = await asyncio.gather(*jobs, return_exceptions=True)
+    done.set()
+    await asyncio.gather(*probes, return_exceptions=True)
+    stats['errors'] = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    stats['failed'] += len(stats['errors'])
+    stats['elapsed'] = time.time() - started
+    return stats
+
+def main():
+    """
+    SSE并发压测
+
+    使用方法：
+    python load_test.py -c 500 -a 5
+    python load_test.py -c 300 -a 10 -b 4 --compress --drop
+    python load_test.py -c 200 -a 3 --url http://localhost:5000
+    python load_test.py -c 1 -a 1000 -w 8 --interactive 2
+    """
+    parser = argparse.ArgumentParser(description='/get-info-stream 并发压测')
+    parser.add_argument('-c', '--clients', type=int, default=300, help='并发SSE客户端数量 (默认: 300)')
+    parser.add_argument('-a', '--addresses', type=int, default=5, help='每个客户端查询的地址数量 (默认: 5)')
+    parser.add_argument('-w', '--workers', type=int, default=64, help='本地模拟服务的worker槽位 (默认: 64)')
+    parser.add_argument('-b', '--batch', type=int, default=1, help='每个batch事件包含的结果数 (默认: 1，不合并)')
+    parser.add_argument('--compress', action='store_true', help='请求gzip压缩的事件流')
+    parser.add_argument('--drop', action='store_true', help='每个客户端收到一半结果后断开，再凭Last-Event-ID重连')
+    parser.add_argument('--interactive', type=int, default=0, help='压测期间同时发送单地址/get-info的客户端数，用于测量交互查询延迟 (默认: 0)')
+    parser.add_argument('--url', type=str, default=None, help='压测已运行的服务，不指定则启动使用模拟抓取的本地服务')
+    args = parser.parse_args()
+
+    base_url = args.url or start_local_server(args.workers)
+    stats = asyncio.run(run_load(base_url, args.clients, args.addresses, args.batch, args.compress, args.drop,
+                                  args.interactive))
+
+    latencies = sorted(stats['latencies']) or [0]
+    print(f"客户端: {args.clients}, 每个客户端地址数: {args.addresses}")
+    print(f"成功: {stats['ok']}, 失败: {stats['failed']}, 同时打开的连接峰值: {stats['peak_open']}, 重连: {stats['reconnects']}")
+    print(f"总耗时: {stats['elapsed']:.2f}s, p50: {latencies[len(latencies) // 2]:.2f}s, p99: {latencies[int(len(latencies) * 0.99) - 1]:.2f}s")
+    if stats['interactive']:
+        interactive = sorted(stats['interactive'])
+        print(f"交互查询: {len(interactive)} 次, 失败: {stats['interactive_failed']}, "
+              f"p50: {interactive[len(interactive) // 2]:.2f}s, 最大: {interactive[-1]:.2f}s")
+    for error in stats['errors'][:5]:
+        print(f"错误: {error!r}")
+    if stats['failed'] or stats['interactive_failed']:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,248 +1,624 @@
-from flask import Flask, request, jsonify, Response
-import subprocess
-from flask_cors import CORS
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from contextlib import asynccontextmanager
+import uvicorn
+import argparse
+import asyncio
+import cProfile
 import os
 import json
+import pstats
+import signal
+import subprocess
+import sys
 import time
-from queue import Queue
-from threading import Thread
+import uuid
+import zlib
+
+from gmgn_scheduler import WorkScheduler, INTERACTIVE, PIPELINE, BACKGROUND, PRIORITIES, parse_quotas
+from gmgn_cache import ResultCache
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 同时运行的抓取子进程上限，每个子进程都会启动一个Chrome；按优先级和任务轮转分配
+SCHEDULER = WorkScheduler(int(os.environ.get('GMGN_WORKERS', '4')))
+
+# 同时运行的 /watch-stream 监控进程上限，与抓取槽位分开计算
+WATCH_LIMIT = int(os.environ.get('GMGN_WATCHERS', '2'))
+WATCHERS = 0
 
-app = Flask(__name__)
-CORS(app)
+# --profile 指定的目录，设置后抓取脚本也会带上 --profile 运行
+PROFILE_DIR = None
 
-def process_address(address, queue):
-    """处理单个地址并将结果放入队列"""
+PROFILED_SCRIPTS = ('gmgn_get_info.py', 'gmgn_get_url.py')
+
+# 钱包信息和持有者列表的缓存，过期数据先返回再后台刷新
+CACHE = ResultCache()
+# 缓存预热：每轮间隔秒数、每轮最多刷新数（0表示不预热）
+WARM_INTERVAL = 60
+WARM_BUDGET = 10
+
+# 结束抓取脚本时等待其清理浏览器的秒数，超时后强制结束整个进程组
+STOP_TIMEOUT = 10
+
+async def start_script(args, env, stderr):
+    """
+    在独立的进程组中启动脚本，结束时可以连同chromedriver和Chrome一起结束
+    """
+    if os.name == 'nt':
+        group = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group = {'start_new_session': True}
+    return await asyncio.create_subprocess_exec(
+        sys.executable, *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=stderr,
+        cwd=CURRENT_DIR,
+        env=env,
+        **group
+    )
+
+def signal_script(process, force=False):
     try:
-        command = f'python gmgn_get_info.py -i {address}'
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            encoding='utf-8',
-            text=True
-        )
-        stdout, stderr = process.communicate()
-        
-        if process.returncode == 0 and stdout.strip():
-            # 假设输出格式为: address,winRate,transactions,profit,balance
-            parts = stdout.strip().split(',')
-            if len(parts) >= 5:
-                result = {
-                    'address': parts[0].strip(),
-                    'winRate': parts[1].strip(),
-                    'transactions': parts[2].strip(),
-                    'profit': parts[3].strip(),
-                    'balance': parts[4].strip()
-                }
-                queue.put(('result', result))
+        if os.name == 'nt':
+            if force:
+                process.kill()
             else:
-                queue.put(('error', f'Invalid data format for address {address}'))
+                # CTRL_BREAK_EVENT 发给整个进程组，脚本收到 SIGBREAK
+                process.send_signal(signal.CTRL_BREAK_EVENT)
         else:
-            queue.put(('error', f'Error processing address {address}: {stderr}'))
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+async def stop_script(process):
+    """
+    先让脚本自行关闭浏览器，超时后强制结束整个进程组
+    """
+    if process.returncode is not None:
+        return
+    signal_script(process)
+    try:
+        await asyncio.wait_for(process.wait(), STOP_TIMEOUT)
+    except asyncio.TimeoutError:
+        signal_script(process, force=True)
+        await process.wait()
+
+async def run_script(*args, priority=PIPELINE, job=None):
+    """
+    异步运行抓取脚本，占用一个worker槽位
+    :param priority: 调度优先级 interactive/pipeline/background
+    :param job: 所属任务，同一任务的脚本与其他任务轮流获得槽位
+    :return: (返回码, stdout, stderr)
+    """
+    # 设置环境变量强制使用UTF-8
+    env = os.environ.copy()
+    env['PYTHONIOENCODING'] = 'utf-8'
+
+    if PROFILE_DIR and args[0] in PROFILED_SCRIPTS:
+        prefix = os.path.join(PROFILE_DIR, f"{args[0][:-3]}_{uuid.uuid4().hex[:8]}")
+        args = (args[0], '--profile', prefix) + args[1:]
+
+    async with SCHEDULER.slot(priority, job):
+        process = await start_script(args, env, stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            # 客户端断开时结束子进程及其浏览器，结束前仍占用槽位
+            await stop_script(process)
+            raise
+    return process.returncode, stdout.decode('utf-8', 'replace'), stderr.decode('utf-8', 'replace')
+
+def parse_info_row(stdout):
+    """
+    解析 gmgn_get_info.py 输出的结果行
+    抓取失败时脚本仍以0退出并输出"获取地址 X 的信息失败"，这里返回None
+    """
+    # 假设输出格式为: address,winRate,transactions,profit,balance
+    parts = stdout.strip().split(',')
+    if len(parts) < 5:
+        return None
+    return {
+        'address': parts[0].strip(),
+        'winRate': parts[1].strip(),
+        'transactions': parts[2].strip(),
+        'profit': parts[3].strip(),
+        'balance': parts[4].strip()
+    }
+
+def is_info_row(stdout):
+    return parse_info_row(stdout) is not None
+
+async def cached_run_script(key, *args, priority=PIPELINE, job=None, valid=None):
+    """
+    带缓存的 run_script，只缓存返回码为0且输出有效的结果
+    :param valid: 判断stdout是否有效的函数，默认只要求非空
+    :return: ((返回码, stdout, stderr), 缓存状态 hit/stale/miss/error)
+    """
+    async def fetch(fetch_priority):
+        # 后台刷新统一归到一个任务，与其他任务轮流获得槽位
+        result = await run_script(*args, priority=fetch_priority,
+                                  job='cache' if fetch_priority == BACKGROUND else job)
+        ok = result[0] == 0 and bool(result[1].strip()) and (valid is None or valid(result[1]))
+        return ok, result
+    return await CACHE.get(key, fetch, priority)
+
+async def process_address(address, priority=PIPELINE, job=None):
+    """处理单个地址，返回 (事件类型, 数据)"""
+    try:
+        (return_code, stdout, stderr), _ = await cached_run_script(('wallet', address), 'gmgn_get_info.py', '-i', address,
+                                                                   priority=priority, job=job, valid=is_info_row)
+
+        if return_code == 0 and stdout.strip():
+            result = parse_info_row(stdout)
+            if result:
+                return 'result', result
+            else:
+                return 'error', f'Invalid data format for address {address}'
+        else:
+            return 'error', f'Error processing address {address}: {stderr}'
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        queue.put(('error', f'Exception processing address {address}: {str(e)}'))
+        return 'error', f'Exception processing address {address}: {str(e)}'
 
-@app.route('/get-info-stream')
-def get_info_stream():
-    """SSE endpoint for real-time updates"""
-    def generate():
-        addresses = request.args.get('addresses', '').split()
-        if not addresses:
-            yield 'data: {"error": "No addresses provided"}\n\n'
-            return
+# 已完成任务的事件保留时间，供断线重连补发
+STREAM_JOB_TTL = 600
+# 没有客户端连接时，未完成的任务最多保留多久
+STREAM_JOB_IDLE_TIMEOUT = 60
+# 每个任务最多缓存的事件数
+REPLAY_BUFFER_SIZE = 10000
+# 空闲时发送注释行的间隔，防止代理断开连接
+KEEP_ALIVE_INTERVAL = 15
 
-        queue = Queue()
-        threads = []
+STREAM_JOBS = {}
 
-        # 启动所有处理线程
-        for address in addresses:
-            thread = Thread(target=process_address, args=(address, queue))
-            thread.start()
-            threads.append(thread)
+class StreamJob:
+    """
+    一次流式查询任务：独立于客户端连接运行，事件带递增编号并缓存，
+    客户端凭 Last-Event-ID 重连后只补发缺失的事件
+    """
+    def __init__(self, addresses, priority=PIPELINE):
+        self.id = uuid.uuid4().hex[:12]
+        self.addresses = addresses
+        self.priority = priority
+        self.events = []  # (序号, 事件类型, 数据)，序号连续
+        self.first_seq = 1
+        self.next_seq = 1
+        self.done = False
+        self.clients = 0
+        self.task = None
+        self.idle_timer = None
+        self._changed = asyncio.Event()
 
-        # 等待结果并发送
-        completed = 0
-        while completed < len(addresses):
-            try:
-                event_type, data = queue.get(timeout=1)
+    def event_id(self, seq):
+        return f'{self.id}-{seq}'
+
+    def append(self, event_type, data):
+        self.events.append((self.next_seq, event_type, data))
+        self.next_seq += 1
+        if len(self.events) > REPLAY_BUFFER_SIZE:
+            del self.events[:len(self.events) - REPLAY_BUFFER_SIZE]
+            self.first_seq = self.events[0][0]
+        # 唤醒所有等待中的连接
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def events_after(self, seq):
+        return self.events[max(0, seq + 1 - self.first_seq):]
+
+    async def wait(self, timeout):
+        """
+        等待新事件或超时
+        """
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def start(self):
+        STREAM_JOBS[self.id] = self
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        # 所有地址并发提交，由SCHEDULER按优先级和任务轮转分配槽位
+        tasks = [asyncio.create_task(process_address(address, self.priority, self.id)) for address in self.addresses]
+        try:
+            # 按完成顺序记录结果，无需轮询
+            for next_done in asyncio.as_completed(tasks):
+                event_type, data = await next_done
                 if event_type == 'result':
-                    yield f'event: result\ndata: {json.dumps(data)}\n\n'
+                    self.append('result', data)
                 elif event_type == 'error':
-                    yield f'event: error\ndata: {json.dumps({"error": data})}\n\n'
-                completed += 1
-            except:
-                # 超时继续等待
+                    self.append('error', {"error": data})
+
+            self.append('complete', {"status": "complete"})
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.done = True
+            self._changed.set()
+            asyncio.get_running_loop().call_later(STREAM_JOB_TTL, STREAM_JOBS.pop, self.id, None)
+
+    def attach(self):
+        self.clients += 1
+        # 客户端重连后取消之前的空闲计时
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+
+    def detach(self):
+        self.clients -= 1
+        if self.clients == 0 and not self.done:
+            self.idle_timer = asyncio.get_running_loop().call_later(STREAM_JOB_IDLE_TIMEOUT, self.cancel_if_idle)
+
+    def cancel_if_idle(self):
+        """
+        长时间无人连接的任务不再继续抓取
+        """
+        if self.clients == 0 and not self.done:
+            self.task.cancel()
+            STREAM_JOBS.pop(self.id, None)
+
+def parse_last_event_id(value):
+    """
+    解析 Last-Event-ID，格式为 <任务id>-<序号>
+    :return: (任务, 序号)，任务不存在时返回 (None, 0)
+    """
+    job_id, _, seq = (value or '').rpartition('-')
+    job = STREAM_JOBS.get(job_id)
+    if job is None or not seq.isdigit():
+        return None, 0
+    return job, int(seq)
+
+def format_event(event_id, event_type, data):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n'
+
+async def job_events(job, after, batch_size, batch_ms):
+    """
+    按序输出任务事件，可选将 result/error 合并为一个 batch 事件
+    :param after: 已收到的最后一个事件序号
+    :param batch_size: 每个batch最多包含的事件数，<=1表示不合并
+    :param batch_ms: batch最长等待毫秒数
+    """
+    seq = after
+    pending = []
+    deadline = None
+    yield 'retry: 3000\n\n'
+    while True:
+        for event_seq, event_type, data in job.events_after(seq):
+            seq = event_seq
+            if batch_size > 1 and event_type != 'complete':
+                if not pending:
+                    deadline = time.monotonic() + batch_ms / 1000
+                pending.append({'event': event_type, 'data': data})
+                if len(pending) >= batch_size:
+                    yield format_event(job.event_id(seq), 'batch', pending)
+                    pending = []
                 continue
+            if pending:
+                yield format_event(job.event_id(seq - 1), 'batch', pending)
+                pending = []
+            yield format_event(job.event_id(seq), event_type, data)
 
-        # 等待所有线程完成
-        for thread in threads:
-            thread.join()
+        if job.done and not job.events_after(seq):
+            if pending:
+                yield format_event(job.event_id(seq), 'batch', pending)
+            return
 
-        # 发送完成事件
-        yield 'event: complete\ndata: {"status": "complete"}\n\n'
+        if pending:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                yield format_event(job.event_id(seq), 'batch', pending)
+                pending = []
+                continue
+        else:
+            timeout = KEEP_ALIVE_INTERVAL
+        before = job.next_seq
+        await job.wait(timeout)
+        if job.next_seq == before and not job.done and not pending:
+            yield ': keep-alive\n\n'
 
-    return Response(generate(), mimetype='text/event-stream')
+async def gzip_stream(chunks):
+    """
+    逐块gzip压缩，每块后同步刷新，保证客户端能立即解出已发送的事件
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        yield compressor.compress(chunk.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
 
-@app.route('/execute', methods=['POST'])
-def execute_command():
+async def get_info_stream(request):
+    """
+    SSE endpoint for real-time updates
+    查询参数: addresses 地址(空格分隔), batch 每批事件数, batch_ms 每批最长等待毫秒, compress=1 启用gzip,
+    priority 调度优先级 pipeline(默认)/background
+    断线重连时通过 Last-Event-ID 请求头（或 lastEventId 参数）只补发缺失的事件
+    """
+    params = request.query_params
+    job, after = parse_last_event_id(request.headers.get('last-event-id') or params.get('lastEventId'))
+    if job is None:
+        addresses = params.get('addresses', '').split()
+        if not addresses:
+            return StreamingResponse(iter(['data: {"error": "No addresses provided"}\n\n']), media_type='text/event-stream')
+        priority = params.get('priority', PIPELINE)
+        if priority not in PRIORITIES or priority == INTERACTIVE:
+            priority = PIPELINE
+        job = StreamJob(addresses, priority)
+        job.start()
+
+    batch_size = int(params.get('batch', '1')) if params.get('batch', '1').isdigit() else 1
+    batch_ms = int(params.get('batch_ms', '200')) if params.get('batch_ms', '200').isdigit() else 200
+
+    async def generate():
+        job.attach()
+        try:
+            async for chunk in job_events(job, after, batch_size, batch_ms):
+                yield chunk
+        finally:
+            job.detach()
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    body = generate()
+    if params.get('compress') == '1' and 'gzip' in request.headers.get('accept-encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+        body = gzip_stream(body)
+    return StreamingResponse(body, media_type='text/event-stream', headers=headers)
+
+async def watch_stream(request):
+    """SSE endpoint: 持续推送代币持有者的 added/removed/changed 事件"""
+    token = request.query_params.get('token', '').strip()
+    count = request.query_params.get('count', '100')
+    interval = request.query_params.get('interval', '300')
+    stale = request.query_params.get('stale', '1800')
+
+    async def generate():
+        global WATCHERS
+        if not token:
+            yield 'data: {"error": "No token provided"}\n\n'
+            return
+        if not (count.isdigit() and interval.isdigit() and stale.isdigit()):
+            yield 'data: {"error": "count, interval and stale must be integers"}\n\n'
+            return
+
+        env = os.environ.copy()
+        env['PYTHONIOENCODING'] = 'utf-8'
+        # 监控进程在整个连接期间占用一个Chrome，长期占用会挡住批量和后台任务，
+        # 所以不占 --workers 的槽位，单独限制数量，超出时直接拒绝
+        if WATCHERS >= WATCH_LIMIT:
+            yield f'data: {json.dumps({"error": f"Too many watchers ({WATCH_LIMIT} running), try again later"})}\n\n'
+            return
+        WATCHERS += 1
+        try:
+            process = await start_script(('gmgn_watch.py', '-i', token, '-n', count, '--interval', interval, '--stale', stale),
+                                         env, stderr=asyncio.subprocess.DEVNULL)
+            try:
+                # 每行一个JSON事件，原样转发
+                async for line in process.stdout:
+                    line = line.decode('utf-8', 'replace').strip()
+                    if not line:
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    yield f'event: {event.pop("event", "message")}\ndata: {json.dumps(event)}\n\n'
+            finally:
+                # 客户端断开时结束监控进程及其浏览器
+                await stop_script(process)
+        finally:
+            WATCHERS -= 1
+
+    return StreamingResponse(generate(), media_type='text/event-stream')
+
+async def execute_command(request):
     try:
-        data = request.json
+        data = await request.json()
         contract_address = data.get('contractAddress')
         address_count = data.get('addressCount')
-        
+
         if not contract_address or not address_count:
-            return jsonify({
+            return JSONResponse({
                 'success': False,
                 'error': 'ContractAddress and addressCount are required'
-            }), 400
+            }, status_code=400)
 
         # 构建命令
         command = f'python gmgn_get_url.py -i {contract_address} -n {address_count}'
         print(f"Executing command: {command}")  # 打印执行的命令
-        
+
         # 执行命令
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            encoding='utf-8',  # 使用 UTF-8 编码
-            text=True
-        )
-        
-        stdout, stderr = process.communicate()
-        return_code = process.returncode
-        
+        (return_code, stdout, stderr), cache_status = await cached_run_script(
+            ('token', str(contract_address), str(address_count)),
+            'gmgn_get_url.py', '-i', str(contract_address), '-n', str(address_count), priority=INTERACTIVE)
+
         print(f"Command return code: {return_code}")
         print(f"Raw stdout: {stdout}")  # 打印原始输出
         print(f"Raw stderr: {stderr}")  # 打印原始错误
-        
+
         # 处理输出，忽略日志信息
         actual_stderr = '\n'.join([line for line in (stderr or '').split('\n') if line and not line.startswith('2024-')])
-        
+
         # 如果进程返回非零状态码
         if return_code != 0:
             error_msg = actual_stderr or f"Command failed with return code {return_code}"
             print(f"Process failed: {error_msg}")
-            return jsonify({
+            return JSONResponse({
                 'success': False,
                 'error': error_msg,
                 'command': command,
                 'return_code': return_code
-            }), 500
-            
+            }, status_code=500)
+
         # 处理输出，忽略空行
         actual_stdout = '\n'.join([line for line in (stdout or '').split('\n') if line.strip()])
-            
+
         # 如果没有实际输出
         if not actual_stdout:
             print("Command executed but produced no output")
-            return jsonify({
+            return JSONResponse({
                 'success': False,
                 'error': '命令执行成功但没有输出',
                 'command': command,
                 'return_code': return_code
-            }), 500
+            }, status_code=500)
 
         print(f"Actual command output: {actual_stdout}")  # 打印实际命令输出
-        
-        return jsonify({
+
+        return JSONResponse({
             'success': True,
             'stdout': actual_stdout,
             'stderr': stderr,  # 保留原始stderr以供调试
             'output': actual_stdout,  # 为了保持与前端代码兼容
             'command': command,  # 返回执行的命令，方便调试
-            'return_code': return_code
+            'return_code': return_code,
+            'cache': cache_status
         })
     except Exception as e:
         print(f"Exception occurred: {str(e)}")  # 打印异常信息
-        return jsonify({
+        return JSONResponse({
             'success': False,
             'error': str(e),
             'command': command if 'command' in locals() else None
-        }), 500
+        }, status_code=500)
 
-@app.route('/get-info', methods=['POST'])
-def get_info():
+async def get_info(request):
     try:
-        data = request.json
+        data = await request.json()
         address = data.get('address')
         if not address:
-            return jsonify({
+            return JSONResponse({
                 'success': False,
                 'error': 'Address parameter is required'
-            }), 400
-            
+            }, status_code=400)
+
         command = f'python gmgn_get_info.py -i {address}'
         print(f"Executing command: {command}")
-        
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # 设置环境变量强制使用UTF-8
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        
-        # 使用UTF-8编码执行命令
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=current_dir,
-            env=env,
-            encoding='utf-8',
-            text=True
-        )
-        
-        stdout, stderr = process.communicate()
-        return_code = process.returncode
-        
+
+        # 多个地址以空格分隔；单个地址按交互查询优先处理
+        addresses = address.split()
+        cache_status = None
+        if len(addresses) == 1:
+            (return_code, stdout, stderr), cache_status = await cached_run_script(
+                ('wallet', addresses[0]), 'gmgn_get_info.py', '-i', addresses[0], priority=INTERACTIVE, valid=is_info_row)
+        else:
+            return_code, stdout, stderr = await run_script('gmgn_get_info.py', '-i', *addresses, priority=PIPELINE)
+
         print(f"Command return code: {return_code}")
         print(f"Raw stdout: {stdout}")
         print(f"Raw stderr: {stderr}")
-        print(f"Working directory: {current_dir}")
-        
+        print(f"Working directory: {CURRENT_DIR}")
+
         # 处理输出，忽略空行
         actual_stdout = '\n'.join([line for line in (stdout or '').split('\n') if line.strip()])
         actual_stderr = '\n'.join([line for line in (stderr or '').split('\n') if line.strip()])
-        
+
         if return_code != 0:
             error_msg = actual_stderr or f"Command failed with return code {return_code}"
             print(f"Process failed: {error_msg}")
-            return jsonify({
+            return JSONResponse({
                 'success': False,
                 'error': error_msg,
                 'command': command,
                 'return_code': return_code,
-                'working_dir': current_dir
-            }), 500
-        
+                'working_dir': CURRENT_DIR
+            }, status_code=500)
+
         if not actual_stdout:
             print("Command executed but produced no output")
-            return jsonify({
+            return JSONResponse({
                 'success': False,
                 'error': '命令执行成功但没有输出',
                 'command': command,
                 'return_code': return_code,
-                'working_dir': current_dir
-            }), 500
-        
-        return jsonify({
+                'working_dir': CURRENT_DIR
+            }, status_code=500)
+
+        return JSONResponse({
             'success': True,
             'stdout': actual_stdout,
             'stderr': actual_stderr,
             'command': command,
             'return_code': return_code,
-            'working_dir': current_dir
+            'working_dir': CURRENT_DIR,
+            'cache': cache_status
         })
     except Exception as e:
         print(f"Exception occurred: {str(e)}")
-        return jsonify({
+        return JSONResponse({
             'success': False,
             'error': str(e),
             'command': command if 'command' in locals() else None
-        }), 500
+        }, status_code=500)
+
+@asynccontextmanager
+async def lifespan(app):
+    warmer = asyncio.create_task(CACHE.run_warmer(WARM_INTERVAL, WARM_BUDGET)) if WARM_BUDGET > 0 else None
+    try:
+        yield
+    finally:
+        if warmer:
+            warmer.cancel()
+
+app = Starlette(
+    routes=[
+        Route('/get-info-stream', get_info_stream),
+        Route('/watch-stream', watch_stream),
+        Route('/execute', execute_command, methods=['POST']),
+        Route('/get-info', get_info, methods=['POST']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
+
+def main():
+    global SCHEDULER, PROFILE_DIR, CACHE, WARM_INTERVAL, WARM_BUDGET, WATCH_LIMIT
+    parser = argparse.ArgumentParser(description='GMGN查询服务')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='监听地址 (默认: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=5000, help='监听端口 (默认: 5000)')
+    parser.add_argument('--workers', type=int, default=None, help='同时运行的抓取进程数 (默认: 环境变量GMGN_WORKERS或4)')
+    parser.add_argument('--reserve', type=int, default=1, help='只留给交互查询(单地址/get-info、/execute)的槽位数 (默认: 1)')
+    parser.add_argument('--watchers', type=int, default=None, help='同时运行的/watch-stream监控进程数，不占用 --workers (默认: 环境变量GMGN_WATCHERS或2)')
+    parser.add_argument('--quota', type=str, action='append', default=[], help='类别并发上限，如 --quota background=2，可重复指定')
+    parser.add_argument('--cache-ttl', type=int, default=300, help='缓存数据的有效秒数 (默认: 300)')
+    parser.add_argument('--cache-stale', type=int, default=3600, help='过期后仍先返回旧数据并后台刷新的最长秒数 (默认: 3600)')
+    parser.add_argument('--cache-size', type=int, default=10000, help='最多缓存的条目数 (默认: 10000)')
+    parser.add_argument('--warm-interval', type=int, default=60, help='缓存预热间隔秒数 (默认: 60)')
+    parser.add_argument('--warm-budget', type=int, default=10, help='每轮预热最多刷新的热门条目数，0表示不预热 (默认: 10)')
+    parser.add_argument('--profile', type=str, default=None, help='性能分析输出目录：服务本身写入 server.prof，每个抓取子进程写入各自的 .prof/.trace.jsonl')
+    args = parser.parse_args()
+
+    try:
+        quotas = parse_quotas(args.quota)
+    except ValueError as e:
+        parser.error(str(e))
+    SCHEDULER = WorkScheduler(args.workers or SCHEDULER.capacity, quotas, args.reserve)
+    if args.watchers is not None:
+        WATCH_LIMIT = args.watchers
+    CACHE = ResultCache(args.cache_ttl, max(args.cache_ttl, args.cache_stale), args.cache_size)
+    WARM_INTERVAL = max(1, args.warm_interval)
+    WARM_BUDGET = args.warm_budget
+
+    if not args.profile:
+        uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+        return
+
+    PROFILE_DIR = os.path.abspath(args.profile)
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+    finally:
+        profile.disable()
+        profile.dump_stats(os.path.join(PROFILE_DIR, 'server.prof'))
+        pstats.Stats(profile, stream=sys.stderr).sort_stats('cumulative').print_stats(20)
+        print(f"性能数据已保存到 {PROFILE_DIR}，可用 python gmgn_profiling.py {PROFILE_DIR}/*.trace.jsonl 汇总抓取命令", file=sys.stderr)
 
 if __name__ == '__main__':
-    app.run(port=5000) 
\ No newline at end of file
+    main()
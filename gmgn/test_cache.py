@@ -0,0 +1,170 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import gmgn_cache
+from gmgn_cache import ResultCache
+from gmgn_scheduler import INTERACTIVE, PIPELINE, BACKGROUND
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+class Fetcher:
+    """
+    记录每次抓取的优先级；gate 不为None时抓取要等 gate 被set才返回
+    """
+    def __init__(self, results=None, gate=None):
+        self.results = list(results or [])
+        self.gate = gate
+        self.calls = []
+        self.cancelled = []
+
+    async def __call__(self, priority):
+        self.calls.append(priority)
+        index = len(self.calls)
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(priority)
+            raise
+        result = self.results.pop(0) if self.results else (True, f'value{index}')
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+class ResultCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(gmgn_cache, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ResultCache(ttl=300, max_stale=3600)
+
+    async def test_hit_within_ttl(self):
+        fetch = Fetcher()
+        self.assertEqual(await self.cache.get('k', fetch, PIPELINE), ('value1', 'miss'))
+        self.clock.now += 299
+        self.assertEqual(await self.cache.get('k', fetch, PIPELINE), ('value1', 'hit'))
+        self.assertEqual(fetch.calls, [PIPELINE])
+
+    async def test_stale_served_and_refreshed_in_background(self):
+        fetch = Fetcher()
+        await self.cache.get('k', fetch, INTERACTIVE)
+        self.clock.now += 301
+        self.assertEqual(await self.cache.get('k', fetch, INTERACTIVE), ('value1', 'stale'))
+        await self.cache.entries['k'].refreshing
+        self.assertEqual(fetch.calls, [INTERACTIVE, BACKGROUND])
+        self.assertEqual(await self.cache.get('k', fetch, INTERACTIVE), ('value2', 'hit'))
+
+    async def test_too_stale_is_fetched_again(self):
+        fetch = Fetcher()
+        await self.cache.get('k', fetch, PIPELINE)
+        self.clock.now += 3601
+        self.assertEqual(await self.cache.get('k', fetch, PIPELINE), ('value2', 'miss'))
+        self.assertEqual(fetch.calls, [PIPELINE, PIPELINE])
+
+    async def test_concurrent_misses_share_one_fetch(self):
+        gate = asyncio.Event()
+        fetch = Fetcher(gate=gate)
+        waiters = [asyncio.create_task(self.cache.get('k', fetch, PIPELINE)) for _ in range(3)]
+        await asyncio.sleep(0)
+        gate.set()
+        self.assertEqual(await asyncio.gather(*waiters), [('value1', 'miss')] * 3)
+        self.assertEqual(fetch.calls, [PIPELINE])
+
+    async def test_miss_escalates_lower_priority_refresh(self):
+        # 后台刷新（例如预热）还在调度队列里时，交互查询不跟着等
+        background = Fetcher(gate=asyncio.Event())
+        self.cache._touch('k', background)
+        low = self.cache.refresh('k', BACKGROUND)
+        await asyncio.sleep(0)
+
+        interactive = Fetcher()
+        self.assertEqual(await self.cache.get('k', interactive, INTERACTIVE), ('value1', 'miss'))
+        self.assertEqual(interactive.calls, [INTERACTIVE])
+        await asyncio.sleep(0)
+        self.assertTrue(low.cancelled())
+        self.assertEqual(background.cancelled, [BACKGROUND])
+        self.assertIsNone(self.cache.entries['k'].refreshing)
+
+    async def test_escalation_keeps_refresh_with_waiters(self):
+        gate = asyncio.Event()
+        fetch = Fetcher(gate=gate)
+        low = asyncio.create_task(self.cache.get('k', fetch, BACKGROUND))
+        await asyncio.sleep(0)
+        high = asyncio.create_task(self.cache.get('k', fetch, INTERACTIVE))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual(fetch.calls, [BACKGROUND, INTERACTIVE])
+        gate.set()
+        self.assertEqual(await low, ('value1', 'miss'))
+        self.assertEqual(await high, ('value2', 'miss'))
+        self.assertEqual(fetch.cancelled, [])
+
+    async def test_same_or_lower_priority_joins_refresh(self):
+        gate = asyncio.Event()
+        fetch = Fetcher(gate=gate)
+        high = asyncio.create_task(self.cache.get('k', fetch, INTERACTIVE))
+        await asyncio.sleep(0)
+        low = asyncio.create_task(self.cache.get('k', fetch, PIPELINE))
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(high, low)
+        self.assertEqual(fetch.calls, [INTERACTIVE])
+
+    async def test_failed_fetch_not_cached(self):
+        fetch = Fetcher([(False, 'failed'), (True, 'ok')])
+        self.assertEqual(await self.cache.get('k', fetch, PIPELINE), ('failed', 'error'))
+        self.assertIsNone(self.cache.entries['k'].fetched_at)
+        self.assertEqual(await self.cache.get('k', fetch, PIPELINE), ('ok', 'miss'))
+        self.assertEqual(len(fetch.calls), 2)
+
+    async def test_failed_refresh_keeps_stale_value(self):
+        fetch = Fetcher([(True, 'ok'), (False, 'failed')])
+        await self.cache.get('k', fetch, PIPELINE)
+        self.clock.now += 301
+        self.assertEqual(await self.cache.get('k', fetch, PIPELINE), ('ok', 'stale'))
+        await self.cache.entries['k'].refreshing
+        self.assertEqual(await self.cache.get('k', fetch, PIPELINE), ('ok', 'stale'))
+
+    async def test_fetch_exception_raised_and_not_cached(self):
+        fetch = Fetcher([RuntimeError('子进程启动失败')])
+        with self.assertLogs(level='WARNING'):
+            with self.assertRaises(RuntimeError):
+                await self.cache.get('k', fetch, PIPELINE)
+        self.assertEqual(await self.cache.get('k', fetch, PIPELINE), ('value2', 'miss'))
+
+    async def test_last_waiter_cancel_cancels_fetch(self):
+        fetch = Fetcher(gate=asyncio.Event())
+        first = asyncio.create_task(self.cache.get('k', fetch, PIPELINE))
+        second = asyncio.create_task(self.cache.get('k', fetch, PIPELINE))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        self.assertEqual(fetch.cancelled, [])
+        second.cancel()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual(fetch.cancelled, [PIPELINE])
+
+    async def test_warm_refreshes_hot_entries(self):
+        fetch = Fetcher()
+        for key in ('hot', 'cold'):
+            await self.cache.get(key, fetch, PIPELINE)
+        # 访问次数按半衰期衰减，近期访问3次的才算热门
+        for _ in range(2):
+            await self.cache.get('hot', fetch, PIPELINE)
+        self.clock.now += 250
+        self.assertEqual(self.cache.warm(budget=10, horizon=60), 1)
+        await self.cache.entries['hot'].refreshing
+        self.assertEqual(fetch.calls, [PIPELINE, PIPELINE, BACKGROUND])
+        self.assertIsNone(self.cache.entries['cold'].refreshing)
+        self.assertEqual(self.cache.entries['hot'].fetched_at, self.clock.now)
+
+if __name__ == '__main__':
+    unittest.main()
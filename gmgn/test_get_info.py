@@ -0,0 +1,106 @@
+import unittest
+from unittest import mock
+
+import gmgn_get_info
+from gmgn_get_info import ERROR_BLOCKED, ERROR_EMPTY, ERROR_NAVIGATION, ERROR_SELECTOR, ERROR_TIMEOUT, PageLoadError
+
+def page_state(text='', ready_state='complete', has_anchor=False, title='GMGN'):
+    return {'readyState': ready_state, 'title': title, 'text': text, 'hasAnchor': has_anchor}
+
+class FakeClock:
+    """
+    替换 time.time / time.sleep，wait_for_page 的等待不真正耗时
+    """
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class ProbeDriver:
+    """
+    按 (开始时间, 页面状态) 列表返回探测结果的driver
+    """
+    def __init__(self, clock, timeline):
+        self.clock = clock
+        self.timeline = timeline
+
+    def execute_script(self, script, *args):
+        state = None
+        for started, value in self.timeline:
+            if self.clock.now >= started:
+                state = value
+        return state
+
+class ClassifyPageTest(unittest.TestCase):
+    def test_loading_page_with_no_data_is_not_empty(self):
+        # 骨架屏、加载中的表格也会显示 No data
+        self.assertIsNone(gmgn_get_info.classify_page(page_state('Holdings\nNo data', ready_state='interactive')))
+        self.assertIsNone(gmgn_get_info.classify_page(page_state('Holdings\nNo data')))
+
+    def test_settled_page_with_no_data_is_empty(self):
+        error = gmgn_get_info.classify_page(page_state('Holdings\nNo data'), settled=True)
+        self.assertEqual(error.kind, ERROR_EMPTY)
+        self.assertFalse(error.retryable)
+
+    def test_settled_page_with_anchor_is_not_empty(self):
+        self.assertIsNone(gmgn_get_info.classify_page(page_state('Activity\n暂无数据', has_anchor=True), settled=True))
+
+    def test_not_found_text_waits_for_settled_page(self):
+        self.assertIsNone(gmgn_get_info.classify_page(page_state('Invalid address')))
+        self.assertEqual(gmgn_get_info.classify_page(page_state('Invalid address'), settled=True).kind, ERROR_NAVIGATION)
+
+    def test_block_and_not_found_title_fail_immediately(self):
+        self.assertEqual(gmgn_get_info.classify_page(page_state(title='Just a moment...', ready_state='loading')).kind, ERROR_BLOCKED)
+        self.assertEqual(gmgn_get_info.classify_page(page_state(title='404 Not Found')).kind, ERROR_NAVIGATION)
+
+class WaitForPageTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(gmgn_get_info, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def wait(self, timeline):
+        started = self.clock.now
+        timeline = [(started + offset, state) for offset, state in timeline]
+        gmgn_get_info.wait_for_page(ProbeDriver(self.clock, timeline), 'anchor')
+        return self.clock.now - started
+
+    def test_slow_api_after_load_event(self):
+        # load事件之后接口12秒才返回，期间一直显示 No data，只有加载提示偶尔变化
+        elapsed = self.wait([
+            (0, page_state('Loading\nNo data')),
+            (4, page_state('Loading.\nNo data')),
+            (8, page_state('Loading..\nNo data')),
+            (12, page_state('62.5%', has_anchor=True)),
+        ])
+        self.assertGreaterEqual(elapsed, 12)
+
+    def test_anchor_after_stable_loading_page(self):
+        # 页面一直不变，接口20秒后才返回，旧版本3秒就判定为找不到元素
+        self.assertGreaterEqual(self.wait([(0, page_state('Loading')), (20, page_state('62.5%', has_anchor=True))]), 20)
+
+    def test_settled_empty_wallet(self):
+        with self.assertRaises(PageLoadError) as context:
+            self.wait([(0, page_state('Holdings\nNo data'))])
+        self.assertEqual(context.exception.kind, ERROR_EMPTY)
+        self.assertLess(self.clock.now - 1000.0, 6)
+
+    def test_selector_grace_counts_from_settled_page(self):
+        # 正文一直变化（例如接口还在陆续返回）时不判定为找不到元素，直到总超时
+        timeline = [(i * 0.5, page_state(f'Loading {i}')) for i in range(100)]
+        with self.assertRaises(PageLoadError) as context:
+            self.wait(timeline)
+        self.assertEqual(context.exception.kind, ERROR_TIMEOUT)
+
+        with self.assertRaises(PageLoadError) as context:
+            self.wait([(0, page_state('Loading')), (5, page_state('Wallet'))])
+        self.assertEqual(context.exception.kind, ERROR_SELECTOR)
+        self.assertEqual(context.exception.max_attempts, 2)
+
+if __name__ == '__main__':
+    unittest.main()
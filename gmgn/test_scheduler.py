@@ -0,0 +1,120 @@
+import asyncio
+import unittest
+
+from gmgn_scheduler import WorkScheduler, INTERACTIVE, PIPELINE, BACKGROUND, parse_quotas
+
+class WorkSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    async def start(self, scheduler, priority, job=None):
+        """
+        启动一个等待槽位的任务，让出一次事件循环使其进入队列或拿到槽位
+        """
+        task = asyncio.create_task(scheduler.acquire(priority, job))
+        await asyncio.sleep(0)
+        return task
+
+    async def test_reserved_slot_only_for_interactive(self):
+        scheduler = WorkScheduler(3, reserved=1)
+        first = await self.start(scheduler, PIPELINE)
+        second = await self.start(scheduler, PIPELINE)
+        third = await self.start(scheduler, PIPELINE)
+        self.assertTrue(first.done() and second.done())
+        self.assertFalse(third.done())
+
+        interactive = await self.start(scheduler, INTERACTIVE)
+        self.assertTrue(interactive.done())
+        self.assertEqual(scheduler.stats()[PIPELINE], {'running': 2, 'waiting': 1, 'jobs': 1})
+
+        scheduler.release(PIPELINE)
+        await asyncio.sleep(0)
+        self.assertTrue(third.done())
+
+    async def test_interactive_first_when_slot_frees(self):
+        scheduler = WorkScheduler(2, reserved=0)
+        await self.start(scheduler, PIPELINE)
+        await self.start(scheduler, PIPELINE)
+        pipeline = await self.start(scheduler, PIPELINE)
+        interactive = await self.start(scheduler, INTERACTIVE)
+        scheduler.release(PIPELINE)
+        await asyncio.sleep(0)
+        self.assertTrue(interactive.done())
+        self.assertFalse(pipeline.done())
+        pipeline.cancel()
+
+    async def test_default_background_quota_leaves_pipeline_slot(self):
+        scheduler = WorkScheduler(4, reserved=1)
+        self.assertEqual(scheduler.quotas[BACKGROUND], 2)
+        tasks = [await self.start(scheduler, BACKGROUND) for _ in range(3)]
+        self.assertEqual([task.done() for task in tasks], [True, True, False])
+        pipeline = await self.start(scheduler, PIPELINE)
+        self.assertTrue(pipeline.done())
+        tasks[2].cancel()
+
+    async def test_explicit_quota(self):
+        scheduler = WorkScheduler(4, quotas={PIPELINE: 1}, reserved=0)
+        first = await self.start(scheduler, PIPELINE, 'a')
+        second = await self.start(scheduler, PIPELINE, 'b')
+        self.assertTrue(first.done())
+        self.assertFalse(second.done())
+        second.cancel()
+
+    async def test_round_robin_between_jobs(self):
+        scheduler = WorkScheduler(1, reserved=0)
+        await self.start(scheduler, PIPELINE, 'holder')
+        order = []
+
+        async def run(job, index):
+            async with scheduler.slot(PIPELINE, job):
+                order.append(f'{job}{index}')
+
+        # 任务a先排入3个请求，任务b后排入2个
+        tasks = [asyncio.create_task(run('a', i)) for i in range(3)]
+        tasks += [asyncio.create_task(run('b', i)) for i in range(2)]
+        await asyncio.sleep(0)
+        scheduler.release(PIPELINE)
+        await asyncio.gather(*tasks)
+        self.assertEqual(order, ['a0', 'b0', 'a1', 'b1', 'a2'])
+
+    async def test_cancelled_waiter_does_not_take_slot(self):
+        scheduler = WorkScheduler(1, reserved=0)
+        await self.start(scheduler, PIPELINE)
+        cancelled = await self.start(scheduler, PIPELINE)
+        waiting = await self.start(scheduler, PIPELINE)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.stats()[PIPELINE]['waiting'], 1)
+
+        scheduler.release(PIPELINE)
+        await asyncio.sleep(0)
+        self.assertTrue(waiting.done())
+        self.assertEqual(scheduler.running[PIPELINE], 1)
+
+    async def test_cancelled_after_grant_releases_slot(self):
+        scheduler = WorkScheduler(1, reserved=0)
+        await self.start(scheduler, PIPELINE)
+        granted = await self.start(scheduler, PIPELINE)
+        waiting = await self.start(scheduler, PIPELINE)
+        # 槽位已分给 granted，但它还没来得及恢复运行就被取消
+        scheduler.release(PIPELINE)
+        granted.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await granted
+        await asyncio.sleep(0)
+        self.assertTrue(waiting.done())
+        self.assertEqual(scheduler.running[PIPELINE], 1)
+
+    async def test_slot_released_on_error(self):
+        scheduler = WorkScheduler(1, reserved=0)
+        with self.assertRaises(RuntimeError):
+            async with scheduler.slot(INTERACTIVE):
+                raise RuntimeError('抓取失败')
+        self.assertEqual(scheduler.running[INTERACTIVE], 0)
+
+    def test_parse_quotas(self):
+        self.assertEqual(parse_quotas(['background=1', 'pipeline=3']), {BACKGROUND: 1, PIPELINE: 3})
+        with self.assertRaises(ValueError):
+            parse_quotas(['bulk=2'])
+        with self.assertRaises(ValueError):
+            parse_quotas(['background=x'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+
+import gmgn_get_info
+import gmgn_get_url
+from gmgn_selectors import SelectorRegistry, INFO_SELECTORS, URL_SELECTORS
+from gmgn_snapshots import SnapshotStore
+
+# 按定位方式手写的页面（不是真实抓取的gmgn页面，见 fixtures/synthetic/README.txt）
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'synthetic')
+ADDRESS = '7BgBvyjrZX1YKz4oh9mjb8ZScatkkwb8DzFx7LoiVkM3'
+ADDRESS_URL = f'https://gmgn.ai/sol/address/{ADDRESS}'
+TOKEN_URL = 'https://gmgn.ai/sol/token/HxRELUuuoQGD6UUqUxe6qGcsX8wuDKQz9HGqsqEAy7n1'
+# 去掉了所有class的页面，只能命中备用定位方式
+PLAIN_ADDRESS = '5Q544fKrFoe6tsEbD7S8EmxGTJYAKtTVhAW5Q5pge4j1'
+PLAIN_ADDRESS_URL = f'https://gmgn.ai/sol/address/{PLAIN_ADDRESS}'
+PLAIN_TOKEN_URL = 'https://gmgn.ai/sol/token/7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr'
+
+class ReplayFixtureTest(unittest.TestCase):
+    """
+    在保存的页面上运行提取函数，不需要浏览器和网络
+    """
+    def setUp(self):
+        self.store = SnapshotStore(FIXTURES_DIR)
+        # 每个测试使用新的注册表，避免上一个页面确认的定位方式影响结果
+        for module, selectors in ((gmgn_get_info, INFO_SELECTORS), (gmgn_get_url, URL_SELECTORS)):
+            patcher = mock.patch.object(module, 'SELECTORS', SelectorRegistry(selectors, overrides_file=None))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_extract_page_info(self):
+        driver = self.store.open(ADDRESS_URL)
+        self.assertIsNotNone(driver)
+        page_info = gmgn_get_info.extract_page_info(driver, ADDRESS_URL, ADDRESS)
+        self.assertEqual(page_info['address'], ADDRESS)
+        self.assertEqual(page_info['win_rate'], '62.5%')
+        self.assertEqual(page_info['recent_7d_profit'], {'percentage': '+38.21%', 'amount': '+$12.4K'})
+        self.assertEqual(page_info['total_trades'], {'current': '128', 'target': '/96'})
+        self.assertEqual(page_info['unrealized_profit'], '-$1.2K')
+        self.assertEqual(page_info['buy_cost']['total'], '$22.9K')
+        self.assertEqual(page_info['token_balance'], '84.31SOL')
+
+    def test_holder_links(self):
+        driver = self.store.open(TOKEN_URL)
+        self.assertIsNotNone(driver)
+        addresses = gmgn_get_url.get_element_text(driver, 'holder_link', 3)
+        self.assertEqual(addresses, [
+            ADDRESS,
+            '5Q544fKrFoe6tsEbD7S8EmxGTJYAKtTVhAW5Q5pge4j1',
+            '9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM',
+        ])
+
+    def test_extract_page_info_fallbacks(self):
+        driver = self.store.open(PLAIN_ADDRESS_URL)
+        self.assertIsNotNone(driver)
+        self.assertTrue(gmgn_get_info.probe_page(driver, 'anchor')['hasAnchor'])
+        page_info = gmgn_get_info.extract_page_info(driver, PLAIN_ADDRESS_URL, PLAIN_ADDRESS)
+        self.assertEqual(page_info['win_rate'], '48.1%')
+        self.assertEqual(page_info['recent_7d_profit'], {'percentage': '-4.07%', 'amount': '-$860'})
+        self.assertEqual(page_info['total_trades'], {'current': '54', 'target': '/61'})
+        self.assertEqual(page_info['total_profit_loss'], '-$3.1K (-18%)')
+        self.assertEqual(page_info['unrealized_profit'], '+$402')
+        self.assertEqual(page_info['buy_cost'], {'total': '$7.6K', 'average': '$7.6K avg $141'})
+        self.assertEqual(page_info['token_balance'], '2.5SOL')
+        # 所有字段都是由备用定位方式找到的
+        for field in INFO_SELECTORS:
+            if field != 'anchor':
+                self.assertEqual(gmgn_get_info.SELECTORS.resolved[field], INFO_SELECTORS[field][1], field)
+
+    def test_holder_links_fallback(self):
+        driver = self.store.open(PLAIN_TOKEN_URL)
+        self.assertIsNotNone(driver)
+        self.assertEqual(gmgn_get_url.SELECTORS.find_elements(driver, 'holders_tab')[0].text.strip(), 'Holders')
+        self.assertTrue(gmgn_get_url.SELECTORS.find_elements(driver, 'holder_row'))
+        addresses = gmgn_get_url.get_element_text(driver, 'holder_link', 3)
+        self.assertEqual(addresses, [PLAIN_ADDRESS, '9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM'])
+        self.assertEqual(gmgn_get_url.SELECTORS.resolved['holder_link'], URL_SELECTORS['holder_link'][1])
+
+    def test_missing_snapshot(self):
+        self.assertIsNone(self.store.open('https://gmgn.ai/sol/address/unknown'))
+
+class SnapshotStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_same_content_stored_once(self):
+        store = SnapshotStore(self.root)
+        first = store.put('u1', '<html><body>a</body></html>')
+        second = store.put('u1', '<html><body>a</body></html>')
+        self.assertEqual(first, second)
+        self.assertEqual(len(store.history('u1')), 2)
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(store.objects_dir)), 1)
+
+    def test_crlf_index(self):
+        # Windows下用文本模式写入的索引是\r\n换行
+        store = SnapshotStore(self.root)
+        digest = store.put('u1', '<html><body>a</body></html>')
+        with open(store.index_file, 'rb') as f:
+            data = f.read()
+        with open(store.index_file, 'wb') as f:
+            f.write(data.replace(b'\n', b'\r\n') + data.replace(b'u1', b'u2').replace(b'\n', b'\r\n'))
+
+        store = SnapshotStore(self.root)
+        self.assertEqual(store.get('u1'), '<html><body>a</body></html>')
+        self.assertEqual(store.get('u2'), '<html><body>a</body></html>')
+        store.put('u3', '<html><body>b</body></html>')
+        self.assertEqual(store.history('u3')[0]['url'], 'u3')
+        self.assertEqual(store.history('u1')[0]['hash'], digest)
+
+if __name__ == '__main__':
+    unittest.main()